@@ -0,0 +1,277 @@
+"""Compare Client and AsyncClient throughput and latency against the mock API.
+
+Starts benchmarks/mock_server.py in a subprocess and, for each concurrency
+level, sends the same number of calls through ``sineps.Client`` (a thread pool)
+and ``sineps.AsyncClient`` (tasks on one event loop):
+
+    python benchmarks/bench_client.py --requests 2000 --concurrency 1 8 32 128 \\
+        --latency 0.02 --jitter 0.005 --rate-429 0.02 --output client.json
+
+Pass ``--url`` to benchmark an already running server instead. ``--hedge p95``
+(or a delay in seconds) enables hedged requests for AsyncClient; combine it
+with ``--slow-rate`` to see their effect on stragglers. With
+``--transport http2`` both clients use the httpx transports and the mock server
+speaks HTTP/2, so all calls are multiplexed over a few connections.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sineps  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+
+
+ROUTES = [
+    {"name": f"route_{i}", "description": f"Questions about topic {i}"}
+    for i in range(5)
+]
+COMPILED_ROUTES = sineps.compile_routes(ROUTES)
+FIELD = {
+    "name": "published_date",
+    "type": "date",
+    "description": "The date the article was published online.",
+}
+
+
+def _percentile(values, p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+def _summarize(client, concurrency, latencies, errors, elapsed, retries, pool):
+    return {
+        "client": client,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "retries": retries,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p50": _percentile(latencies, 50) * 1000,
+            "p90": _percentile(latencies, 90) * 1000,
+            "p99": _percentile(latencies, 99) * 1000,
+            "max": max(latencies) * 1000 if latencies else 0.0,
+        },
+        "pool": pool,
+    }
+
+
+def _call(client, endpoint, query):
+    if endpoint == "intent-router":
+        return client.exec_intent_router(query, COMPILED_ROUTES)
+    return client.exec_filter_extractor(query, FIELD)
+
+
+def _hedge_policy(args):
+    if args.hedge is None:
+        return None
+    delay = None if args.hedge == "p95" else float(args.hedge)
+    return sineps.HedgePolicy(
+        delay=delay, max_ratio=args.hedge_max_ratio, min_samples=50
+    )
+
+
+def run_sync(url, args, concurrency):
+    endpoint = args.endpoint
+    queries = [f"query number {i}" for i in range(args.requests)]
+    latencies = []
+    errors = 0
+    retries = 0
+
+    transport = None
+    if args.transport == "http2":
+        transport = sineps.HTTPXTransport(http1=False, max_connections=concurrency)
+    with sineps.Client(
+        "benchmark",
+        base_url=url,
+        pool_maxsize=concurrency,
+        retry=sineps.RetryPolicy(max_attempts=args.max_attempts, backoff_base=0.01),
+        transport=transport,
+    ) as client:
+
+        def timed(query):
+            start = time.perf_counter()
+            try:
+                response = _call(client, endpoint, query)
+            except sineps.APIError:
+                return time.perf_counter() - start, None
+            return time.perf_counter() - start, response
+
+        for query in queries[: min(concurrency, 16)]:
+            timed(query)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for latency, response in executor.map(timed, queries):
+                latencies.append(latency)
+                if response is None:
+                    errors += 1
+                else:
+                    retries += response.retries
+        elapsed = time.perf_counter() - start
+        pool = client.pool_stats()
+    return _summarize("Client", concurrency, latencies, errors, elapsed, retries, pool)
+
+
+def run_async(url, args, concurrency):
+    endpoint = args.endpoint
+    queries = [f"query number {i}" for i in range(args.requests)]
+
+    async def main():
+        latencies = []
+        errors = 0
+        retries = 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        transport = None
+        if args.transport == "http2":
+            transport = sineps.AsyncHTTPXTransport(
+                http1=False, max_connections=concurrency
+            )
+        async with sineps.AsyncClient(
+            "benchmark",
+            base_url=url,
+            limit=max(concurrency, 1),
+            retry=sineps.RetryPolicy(max_attempts=args.max_attempts, backoff_base=0.01),
+            transport=transport,
+            hedge=_hedge_policy(args),
+        ) as client:
+
+            async def timed(query):
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        response = await _call(client, endpoint, query)
+                    except sineps.APIError:
+                        return time.perf_counter() - start, None
+                    return time.perf_counter() - start, response
+
+            await asyncio.gather(*(timed(q) for q in queries[: min(concurrency, 16)]))
+
+            start = time.perf_counter()
+            results = await asyncio.gather(*(timed(query) for query in queries))
+            elapsed = time.perf_counter() - start
+            pool = client.pool_stats()
+            hedge = client.hedge_stats()
+
+        for latency, response in results:
+            latencies.append(latency)
+            if response is None:
+                errors += 1
+            else:
+                retries += response.retries
+        result = _summarize(
+            "AsyncClient", concurrency, latencies, errors, elapsed, retries, pool
+        )
+        result["hedge"] = hedge
+        return result
+
+    return asyncio.run(main())
+
+
+def _run(args, url):
+    results = []
+    for concurrency in args.concurrency:
+        for name, run in (("Client", run_sync), ("AsyncClient", run_async)):
+            if args.client not in ("both", name):
+                continue
+            result = run(url, args, concurrency)
+            result["transport"] = args.transport
+            results.append(result)
+            latency = result["latency_ms"]
+            print(
+                f"{name:<12} c={concurrency:<4} "
+                f"{result['throughput_rps']:8.1f} req/s "
+                f"p50={latency['p50']:7.2f}ms p99={latency['p99']:7.2f}ms "
+                f"errors={result['errors']} retries={result['retries']}",
+                file=sys.stderr,
+            )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="Use a running server")
+    parser.add_argument(
+        "--endpoint",
+        choices=("intent-router", "filter-extractor"),
+        default="intent-router",
+    )
+    parser.add_argument(
+        "--client", choices=("both", "Client", "AsyncClient"), default="both"
+    )
+    parser.add_argument(
+        "--transport",
+        choices=("default", "http2"),
+        default="default",
+        help="default: requests/aiohttp over HTTP/1.1; http2: httpx over h2c",
+    )
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=0.5)
+    parser.add_argument(
+        "--hedge",
+        default=None,
+        help="Hedge AsyncClient calls after this many seconds, or 'p95'",
+    )
+    parser.add_argument("--hedge-max-ratio", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    server = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "rate_429": args.rate_429,
+        "slow_rate": args.slow_rate,
+        "slow_latency": args.slow_latency,
+        "seed": args.seed,
+        "http2": args.transport == "http2",
+    }
+    if args.url:
+        server = {"url": args.url}
+        results = _run(args, args.url)
+    else:
+        with MockServer(**server) as mock:
+            results = _run(args, mock.url)
+
+    report = {
+        "benchmark": "client",
+        "python": sys.version.split()[0],
+        "sineps": sineps.__version__,
+        "endpoint": args.endpoint,
+        "transport": args.transport,
+        "max_attempts": args.max_attempts,
+        "hedge": args.hedge,
+        "server": server,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Measure the cold import time of sineps and guard it against regressions.
+
+Each sample runs ``import sineps`` in a fresh interpreter, so the numbers
+include everything a short-lived process (CLI, serverless function) pays
+before its first request.
+
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --runs 20 --budget-ms 80 --output import.json
+
+Exits with status 1 when the median import time exceeds the budget or when a
+heavy optional dependency is imported eagerly.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported when the code path that needs them runs.
+LAZY_MODULES = ("requests", "aiohttp", "asyncio", "sqlite3")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "loaded": [m for m in {lazy!r} if m in sys.modules],
+}}))
+"""
+
+SCENARIOS = {
+    "import sineps": "import sineps",
+    "sineps.Client()": "import sineps; sineps.Client('key')",
+    "sineps.AsyncClient()": "import sineps; sineps.AsyncClient('key')",
+}
+
+
+def _probe(statement: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (ROOT, env.get("PYTHONPATH", ""))))
+    output = subprocess.check_output(
+        [sys.executable, "-c", PROBE.format(statement=statement, lazy=LAZY_MODULES)],
+        env=env,
+    )
+    return json.loads(output)
+
+
+def _run_scenario(statement: str, runs: int) -> dict:
+    samples = [_probe(statement) for _ in range(runs)]
+    seconds = sorted(sample["seconds"] for sample in samples)
+    return {
+        "runs": runs,
+        "median_ms": statistics.median(seconds) * 1000,
+        "min_ms": seconds[0] * 1000,
+        "max_ms": seconds[-1] * 1000,
+        "loaded": samples[-1]["loaded"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100.0,
+        help="Maximum median time for 'import sineps' (default: 100)",
+    )
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {
+        name: _run_scenario(statement, args.runs)
+        for name, statement in SCENARIOS.items()
+    }
+
+    baseline = results["import sineps"]
+    failures = []
+    if baseline["median_ms"] > args.budget_ms:
+        failures.append(
+            f"import sineps took {baseline['median_ms']:.1f}ms "
+            f"(budget {args.budget_ms:.1f}ms)"
+        )
+    if baseline["loaded"]:
+        failures.append(
+            "import sineps eagerly loaded: " + ", ".join(baseline["loaded"])
+        )
+
+    report = {
+        "python": sys.version.split()[0],
+        "budget_ms": args.budget_ms,
+        "results": results,
+        "failures": failures,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        print(
+            f"{name:<24} median={result['median_ms']:7.1f}ms "
+            f"min={result['min_ms']:7.1f}ms max={result['max_ms']:7.1f}ms "
+            f"loaded={','.join(result['loaded']) or '-'}"
+        )
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
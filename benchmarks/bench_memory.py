@@ -0,0 +1,130 @@
+"""Measure the memory retained per response object.
+
+Builds N intent router and filter extractor responses from decoded JSON
+payloads (the same path the clients use), keeps them alive, and reports the
+bytes per result held according to tracemalloc:
+
+* ``lazy``: the responses as returned by the client, nothing accessed yet
+* ``indices``: after reading ``response.indices``
+* ``materialized``: after reading ``response.result`` on every response
+
+Filter extractor results are built eagerly: the slotted filter tree is smaller
+than the decoded JSON it would otherwise have to keep around.
+
+    python benchmarks/bench_memory.py --count 100000 --output memory.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sineps._codec import default_codec  # noqa: E402
+from sineps._rest_adapter import Response  # noqa: E402
+from sineps.filter_extractor import FilterExtractorResponse  # noqa: E402
+from sineps.intent_router import IntentRouterResponse, compile_routes  # noqa: E402
+
+
+ROUTES = [
+    {
+        "name": f"route_{i}",
+        "description": f"Description of route {i}",
+        "utterances": [f"example {i}", f"another example {i}"],
+    }
+    for i in range(5)
+]
+
+
+def _intent_router_payload(i: int) -> bytes:
+    return default_codec().dumps(
+        {"result": {"routes": [{"index": i % 5, "name": f"route_{i % 5}"}]}}
+    )
+
+
+def _filter_extractor_payload(i: int) -> bytes:
+    return default_codec().dumps(
+        {
+            "result": {
+                "type": "ConjunctedFilter",
+                "conjunction": "AND",
+                "filters": [
+                    {"type": "Filter", "operator": ">=", "value": str(i)},
+                    {"type": "Filter", "operator": "<", "value": str(i + 100)},
+                ],
+            }
+        }
+    )
+
+
+def _measure(build, count: int, steps) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        responses = [build(i) for i in range(count)]
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+        results = {"lazy": (current - start) / count}
+        for name, step in steps:
+            for response in responses:
+                step(response)
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            results[name] = (current - start) / count
+    finally:
+        tracemalloc.stop()
+    del responses
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    codec = default_codec()
+    routes = compile_routes(ROUTES)
+
+    def build_intent_router(i):
+        data = codec.loads(_intent_router_payload(i))
+        return IntentRouterResponse(Response(200, data=data), routes)
+
+    def build_filter_extractor(i):
+        data = codec.loads(_filter_extractor_payload(i))
+        return FilterExtractorResponse(Response(200, data=data))
+
+    report = {
+        "python": sys.version.split()[0],
+        "codec": codec.name,
+        "count": args.count,
+        "bytes_per_result": {
+            "intent_router": _measure(
+                build_intent_router,
+                args.count,
+                [
+                    ("indices", lambda r: r.indices),
+                    ("materialized", lambda r: r.result),
+                ],
+            ),
+            "filter_extractor": _measure(build_filter_extractor, args.count, []),
+        },
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    for endpoint, results in report["bytes_per_result"].items():
+        print(
+            f"{endpoint:<18} "
+            + " ".join(f"{mode}={size:.0f}B" for mode, size in results.items())
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Microbenchmarks for the client-side work done on every call.
+
+Times validation, request serialization, response decoding and response
+object construction without any network I/O:
+
+    python benchmarks/bench_micro.py --output micro.json
+    python benchmarks/bench_micro.py --filter codec
+
+Each result is the best of ``--repeat`` runs, reported in nanoseconds per call.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sineps  # noqa: E402
+from sineps._codec import CODECS  # noqa: E402
+from sineps._local_router import LexicalIndex  # noqa: E402
+from sineps._rest_adapter import Response  # noqa: E402
+from sineps._validate import (  # noqa: E402
+    validate_field,
+    validate_filter_extractor_query,
+    validate_intent_router_query,
+    validate_routes,
+)
+from sineps.filter_extractor import (  # noqa: E402
+    FilterExtractorResponse,
+    calculate_date,
+)
+from sineps.intent_router import IntentRouterResponse  # noqa: E402
+
+
+QUERY = "How does the immune system respond to a new virus?"
+ROUTES = [
+    {
+        "name": f"route_{i}",
+        "description": f"Questions about topic {i}, in any level of detail.",
+        "utterances": [f"example question {j} about topic {i}" for j in range(10)],
+    }
+    for i in range(5)
+]
+FIELD = {
+    "name": "published_date",
+    "type": "date",
+    "description": "The date the article was published online.",
+}
+INTENT_ROUTER_DATA = {"result": {"routes": [{"index": 2, "name": "route_2"}]}}
+FILTER_EXTRACTOR_DATA = {
+    "result": {
+        "type": "ConjunctedFilter",
+        "conjunction": "AND",
+        "filters": [
+            {"type": "Filter", "operator": ">=", "value": "${current_date - 1m}"},
+            {"type": "Filter", "operator": "<=", "value": "2024-12-31"},
+        ],
+    }
+}
+
+
+def _available_codecs():
+    codecs = {}
+    for name, codec_class in CODECS.items():
+        try:
+            codecs[name] = codec_class()
+        except ImportError:
+            pass
+    return codecs
+
+
+def _cases():
+    compiled_routes = sineps.compile_routes(ROUTES)
+    intent_router_response = Response(200, data=INTENT_ROUTER_DATA)
+    filter_extractor_response = Response(200, data=FILTER_EXTRACTOR_DATA)
+    result = FilterExtractorResponse(filter_extractor_response).result
+    predicate = sineps.compile_predicate(result, FIELD, date(2024, 3, 31))
+    today = date(2024, 3, 31)
+    lexical_index = LexicalIndex(compiled_routes)
+
+    cases = {
+        "validate.intent_router_query": lambda: validate_intent_router_query(QUERY),
+        "validate.routes": lambda: validate_routes(ROUTES),
+        "validate.filter_extractor_query": (
+            lambda: validate_filter_extractor_query(QUERY)
+        ),
+        "validate.field": lambda: validate_field(FIELD),
+        "routes.compile": lambda: sineps.compile_routes(ROUTES),
+        "routes.request_body": lambda: compiled_routes.request_body(QUERY, False),
+        "local_router.build_index": lambda: LexicalIndex(compiled_routes),
+        "local_router.scores": lambda: lexical_index.scores(QUERY),
+        "response.intent_router": (
+            lambda: IntentRouterResponse(intent_router_response, compiled_routes)
+        ),
+        "response.intent_router.result": (
+            lambda: IntentRouterResponse(intent_router_response, compiled_routes).result
+        ),
+        "response.filter_extractor": (
+            lambda: FilterExtractorResponse(filter_extractor_response)
+        ),
+        "dates.calculate_date": (lambda: calculate_date(today, "${current_date - 1m}")),
+        "dates.calculate_date.uncached": (
+            lambda: calculate_date.__wrapped__(today, "${current_date - 1m}")
+        ),
+        "filters.compile_predicate": (
+            lambda: sineps.compile_predicate(result, FIELD, today)
+        ),
+        "filters.predicate": lambda: predicate("2024-03-15"),
+    }
+    request = {"query": QUERY, "routes": ROUTES, "allow_none": False}
+    for name, codec in _available_codecs().items():
+        encoded = codec.dumps(request)
+        response = codec.dumps(FILTER_EXTRACTOR_DATA)
+        cases[f"codec.{name}.dumps_request"] = lambda c=codec: c.dumps(request)
+        cases[f"codec.{name}.loads_request"] = lambda c=codec, b=encoded: c.loads(b)
+        cases[f"codec.{name}.loads_response"] = lambda c=codec, b=response: c.loads(b)
+    return cases
+
+
+def _measure(fn, repeat: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--filter", default=None, help="Only run cases containing this string"
+    )
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, fn in _cases().items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = {"ns_per_call": _measure(fn, args.repeat)}
+        print(f"{name:<40} {results[name]['ns_per_call']:12.0f} ns", file=sys.stderr)
+
+    report = {
+        "benchmark": "micro",
+        "python": sys.version.split()[0],
+        "sineps": sineps.__version__,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
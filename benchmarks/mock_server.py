@@ -0,0 +1,267 @@
+"""A local mock of the Sineps API for benchmarks.
+
+Serves ``POST /v1/intent-router`` and ``POST /v1/filter-extractor`` with the
+same response shapes as api.sineps.io, after a configurable delay, and can
+inject 500 errors, 429 responses and stalled requests at a given rate:
+
+    python benchmarks/mock_server.py --port 8080 --latency 0.02 --jitter 0.01 \\
+        --error-rate 0.01 --rate-429 0.05
+
+Point a client at it with ``base_url``:
+
+    client = sineps.Client(api_key, base_url="http://127.0.0.1:8080")
+
+With ``--http2`` it serves cleartext HTTP/2 with prior knowledge (h2c) instead
+of HTTP/1.1, for ``sineps.HTTPXTransport(http1=False)``. ``GET /stats``
+returns request counters. With ``--port 0`` a free port is
+picked; the first line printed is always ``listening on <url>``.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import zlib
+
+from aiohttp import web
+
+
+FILTER_RESULT = {
+    "type": "ConjunctedFilter",
+    "conjunction": "AND",
+    "filters": [
+        {"type": "Filter", "operator": ">=", "value": "${current_date - 1m}"},
+        {"type": "Filter", "operator": "<=", "value": "${current_date - 0d}"},
+    ],
+}
+
+
+class MockAPI:
+    """The endpoints, independent of the HTTP server that serves them."""
+
+    def __init__(
+        self,
+        latency: float = 0.02,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_429: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 0.5,
+        seed: int = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.rng = random.Random(seed)
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0}
+        self.handlers = {
+            "/v1/intent-router": self.route,
+            "/v1/filter-extractor": self.extract,
+        }
+
+    def route(self, body):
+        index = zlib.crc32(body["query"].encode("utf-8")) % len(body["routes"])
+        return {"routes": [{"index": index, "name": body["routes"][index]["name"]}]}
+
+    def extract(self, body):
+        return FILTER_RESULT
+
+    async def handle(self, method, path, headers, body):
+        """Return ``(status, extra headers, JSON payload)`` for one request."""
+        if method == "GET" and path == "/stats":
+            return 200, {}, self.stats
+        handler = self.handlers.get(path) if method == "POST" else None
+        if handler is None:
+            return 404, {}, {"detail": "Not found"}
+
+        self.stats["requests"] += 1
+        if not headers.get("api-key"):
+            return 401, {}, {"detail": "Missing API key"}
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return 400, {}, {"detail": "Invalid JSON"}
+
+        # Exponential jitter gives the long tail real services have.
+        delay = self.latency
+        if self.jitter > 0:
+            delay += self.rng.expovariate(1.0 / self.jitter)
+        # Stragglers: a few requests stall, as on an overloaded replica.
+        if self.slow_rate > 0 and self.rng.random() < self.slow_rate:
+            delay += self.slow_latency
+        await asyncio.sleep(delay)
+
+        draw = self.rng.random()
+        if draw < self.rate_429:
+            self.stats["throttled"] += 1
+            return 429, {"Retry-After": "0"}, {"detail": "Too many requests"}
+        if draw < self.rate_429 + self.error_rate:
+            self.stats["errors"] += 1
+            return 500, {}, {"detail": "Internal server error"}
+        return 200, {}, {"result": handler(data)}
+
+
+def create_app(**options) -> web.Application:
+    api = MockAPI(**options)
+
+    async def handle(request):
+        status, headers, payload = await api.handle(
+            request.method, request.path, request.headers, await request.read()
+        )
+        return web.json_response(payload, status=status, headers=headers)
+
+    app = web.Application()
+    app.router.add_route("*", "/{path:.*}", handle)
+    return app
+
+
+class H2Protocol(asyncio.Protocol):
+    """A minimal cleartext HTTP/2 (h2c, prior knowledge) server using h2."""
+
+    def __init__(self, api: MockAPI):
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+
+        self.api = api
+        self.conn = H2Connection(
+            H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        self.streams = {}
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.conn.initiate_connection()
+        transport.write(self.conn.data_to_send())
+
+    def data_received(self, data):
+        import h2.events
+        import h2.exceptions
+
+        try:
+            events = self.conn.receive_data(data)
+        except h2.exceptions.ProtocolError:
+            self.transport.write(self.conn.data_to_send())
+            self.transport.close()
+            return
+        for event in events:
+            if isinstance(event, h2.events.RequestReceived):
+                self.streams[event.stream_id] = (dict(event.headers), bytearray())
+            elif isinstance(event, h2.events.DataReceived):
+                self.streams[event.stream_id][1].extend(event.data)
+                self.conn.acknowledge_received_data(
+                    event.flow_controlled_length, event.stream_id
+                )
+            elif isinstance(event, h2.events.StreamEnded):
+                headers, body = self.streams.pop(event.stream_id)
+                asyncio.ensure_future(self.respond(event.stream_id, headers, body))
+            elif isinstance(event, h2.events.StreamReset):
+                self.streams.pop(event.stream_id, None)
+        self.transport.write(self.conn.data_to_send())
+
+    async def respond(self, stream_id, headers, body):
+        import h2.exceptions
+
+        status, extra, payload = await self.api.handle(
+            headers[":method"], headers[":path"].split("?")[0], headers, bytes(body)
+        )
+        if self.transport.is_closing():
+            return
+        # Responses are far smaller than the initial flow-control window.
+        data = json.dumps(payload).encode("utf-8")
+        response_headers = [
+            (":status", str(status)),
+            ("content-type", "application/json"),
+            ("content-length", str(len(data))),
+        ] + [(key.lower(), value) for key, value in extra.items()]
+        try:
+            self.conn.send_headers(stream_id, response_headers)
+            self.conn.send_data(stream_id, data, end_stream=True)
+        except h2.exceptions.StreamClosedError:
+            return
+        self.transport.write(self.conn.data_to_send())
+
+
+class MockServer:
+    """Run the mock server in a subprocess so it does not share the GIL."""
+
+    def __init__(self, host: str = "127.0.0.1", **options):
+        self.host = host
+        self.options = options
+        self.url = None
+        self._process = None
+
+    def __enter__(self):
+        args = [sys.executable, __file__, "--host", self.host, "--port", "0"]
+        for key, value in self.options.items():
+            flag = f"--{key.replace('_', '-')}"
+            if value is True:
+                args.append(flag)
+            elif value is not None and value is not False:
+                args += [flag, str(value)]
+        self._process = subprocess.Popen(args, stdout=subprocess.PIPE, text=True)
+        line = self._process.stdout.readline().strip()
+        if not line.startswith("listening on "):
+            self._process.kill()
+            raise RuntimeError(f"Mock server failed to start: {line!r}")
+        self.url = line[len("listening on ") :]
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._process.terminate()
+        self._process.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Mean extra delay")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument(
+        "--slow-rate", type=float, default=0.0, help="Fraction of stalled requests"
+    )
+    parser.add_argument("--slow-latency", type=float, default=0.5, help="Seconds")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument(
+        "--http2", action="store_true", help="Serve cleartext HTTP/2 only (h2c)"
+    )
+    args = parser.parse_args(argv)
+
+    options = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "rate_429": args.rate_429,
+        "slow_rate": args.slow_rate,
+        "slow_latency": args.slow_latency,
+        "seed": args.seed,
+    }
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    host, port = sock.getsockname()[:2]
+    print(f"listening on http://{host}:{port}", flush=True)
+    if not args.http2:
+        web.run_app(create_app(**options), sock=sock, print=None, access_log=None)
+        return
+
+    api = MockAPI(**options)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(loop.create_server(lambda: H2Protocol(api), sock=sock))
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,15 @@ setuptools.setup(
     long_description=long_description,
     long_description_content_type="text/markdown",
     packages=setuptools.find_packages(),
-    python_requires=">=3.6",
+    python_requires=">=3.7",
     license=" ",
     url=" ",
-    install_requires=["requests>=2.24.0", "aiohttp>=3.6.2", "python-dateutil>=2.9.0"],
+    install_requires=["requests>=2.24.0", "aiohttp>=3.6.2"],
+    extras_require={
+        "orjson": ["orjson>=3.6"],
+        "ujson": ["ujson>=5.0"],
+        "numpy": ["numpy>=1.20"],
+        "http2": ["httpx>=0.23", "h2>=4.0"],
+    },
+    entry_points={"console_scripts": ["sineps=sineps._cli:main"]},
 )
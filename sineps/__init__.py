@@ -1,4 +1,33 @@
 from .__version__ import __version__
 
 from ._client import *
+from ._cache import BaseCache, LRUCache, SQLiteCache
+from ._retry import RetryPolicy, RetryBudget
+from ._hedge import HedgePolicy
+from ._timeout import Timeout
+from ._circuit_breaker import CircuitBreaker
+from ._local_router import LocalRouter
+from ._rate_limit import RateLimiter
+from ._codec import JSONCodec, OrjsonCodec, UjsonCodec
+from ._metrics import Metrics, MetricsHook
+from ._transport import (
+    Transport,
+    AsyncTransport,
+    TransportResponse,
+    RequestsTransport,
+    AiohttpTransport,
+    HTTPXTransport,
+    AsyncHTTPXTransport,
+)
+from .intent_router import (
+    Routes,
+    CompiledRoutes,
+    CompiledRouteGroups,
+    IntentRouterResponse,
+    compile_routes,
+    compile_route_groups,
+)
+from .filter_extractor import FilterExtractorResponse
+from .filter_compiler import compile_predicate, compile_mask
+from .filter_query import to_sql_where, to_elasticsearch_query
 from ._exceptions import *
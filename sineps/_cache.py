@@ -0,0 +1,383 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Iterable, Iterator, Tuple, Union
+
+from ._codec import JSONCodec, get_codec
+
+
+SET_MANY_CHUNK_SIZE = 500
+
+
+def make_cache_key(*parts) -> str:
+    payload = json.dumps(
+        parts, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+class BaseCache:
+    def get(self, key: str):
+        raise NotImplementedError
+
+    def set(self, key: str, value):
+        raise NotImplementedError
+
+    def set_many(self, items: Iterable[Tuple[str, object]]):
+        for key, value in items:
+            self.set(key, value)
+
+    def items(self) -> Iterator[Tuple[str, object]]:
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+    def load(self, path: str) -> int:
+        count = 0
+
+        def read_items():
+            nonlocal count
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    count += 1
+                    yield item["key"], item["data"]
+
+        self.set_many(read_items())
+        return count
+
+    def dump(self, path: str) -> int:
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for key, value in self.items():
+                f.write(json.dumps({"key": key, "data": value}, ensure_ascii=False))
+                f.write("\n")
+                count += 1
+        return count
+
+
+class LRUCache(BaseCache):
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = None,
+        ttl: float = None,
+        json_codec: Union[str, JSONCodec] = "auto",
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._codec = get_codec(json_codec)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value):
+        size = len(self._codec.dumps(value))
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def items(self):
+        with self._lock:
+            entries = list(self._entries.items())
+        now = time.monotonic()
+        for key, (value, _, expires_at) in entries:
+            if expires_at is None or expires_at > now:
+                yield key, value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache(BaseCache):
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = None,
+        timeout: float = 30.0,
+        mmap_size: int = 256 * 1024 * 1024,
+        json_codec: Union[str, JSONCodec] = "auto",
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._codec = get_codec(json_codec)
+        self.timeout = timeout
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._errors = 0
+        self._setup()
+
+    def _connect(self, name: str = "conn", timeout: float = None):
+        conn = getattr(self._local, name, None)
+        if conn is not None and getattr(self._local, f"{name}_pid") == os.getpid():
+            return conn
+        import sqlite3
+
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout if timeout is None else timeout,
+            isolation_level=None,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        setattr(self._local, name, conn)
+        setattr(self._local, f"{name}_pid", os.getpid())
+        return conn
+
+    def _try_write(self, sql: str, params):
+        # Reads must not wait for another process's write lock, so writes made
+        # while reading go through a connection that gives up immediately.
+        import sqlite3
+
+        try:
+            self._connect("touch_conn", timeout=0).execute(sql, params)
+        except sqlite3.OperationalError:
+            pass
+
+    def _setup(self):
+        conn = self._connect()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sineps_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS sineps_cache_accessed_at
+                ON sineps_cache (accessed_at);
+            CREATE TABLE IF NOT EXISTS sineps_cache_totals (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                entries INTEGER NOT NULL,
+                bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO sineps_cache_totals VALUES (0, 0, 0);
+            CREATE TRIGGER IF NOT EXISTS sineps_cache_insert
+                AFTER INSERT ON sineps_cache BEGIN
+                UPDATE sineps_cache_totals
+                    SET entries = entries + 1, bytes = bytes + NEW.size;
+            END;
+            CREATE TRIGGER IF NOT EXISTS sineps_cache_delete
+                AFTER DELETE ON sineps_cache BEGIN
+                UPDATE sineps_cache_totals
+                    SET entries = entries - 1, bytes = bytes - OLD.size;
+            END;
+            """
+        )
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str):
+        import sqlite3
+
+        now = time.time()
+        try:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT value, expires_at FROM sineps_cache WHERE key = ?", (key,)
+                )
+                .fetchone()
+            )
+        except sqlite3.Error:
+            # A broken or busy cache is a miss, not a failed call.
+            self._count("_errors")
+            row = None
+        if row is None:
+            self._count("_misses")
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            self._try_write(
+                "DELETE FROM sineps_cache WHERE key = ? AND expires_at <= ?",
+                (key, now),
+            )
+            self._count("_expirations")
+            self._count("_misses")
+            return None
+        self._try_write(
+            "UPDATE sineps_cache SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+            (now, key, now - 1.0),
+        )
+        self._count("_hits")
+        return self._codec.loads(value)
+
+    def set(self, key: str, value):
+        import sqlite3
+
+        try:
+            # Called on the request path: give up at once if another process
+            # holds the write lock instead of waiting up to `timeout`.
+            self._set_chunk([(key, value)], self._connect("touch_conn", timeout=0))
+        except sqlite3.Error:
+            # Skip the write rather than lose a response that was already paid for.
+            self._count("_errors")
+
+    def set_many(self, items):
+        # Commits in chunks so a large warm-up never holds the write lock for long.
+        items = iter(items)
+        while True:
+            chunk = list(islice(items, SET_MANY_CHUNK_SIZE))
+            if not chunk:
+                return
+            self._set_chunk(chunk)
+
+    def _set_chunk(self, items, conn=None):
+        conn = conn or self._connect()
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, value in items:
+                encoded = self._codec.dumps(value)
+                if self.max_bytes is not None and len(encoded) > self.max_bytes:
+                    continue
+                conn.execute("DELETE FROM sineps_cache WHERE key = ?", (key,))
+                conn.execute(
+                    "INSERT INTO sineps_cache VALUES (?, ?, ?, ?, ?)",
+                    (key, encoded, len(encoded), expires_at, now),
+                )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn):
+        while True:
+            entries, total_bytes = conn.execute(
+                "SELECT entries, bytes FROM sineps_cache_totals"
+            ).fetchone()
+            excess = 0
+            if self.max_entries is not None and entries > self.max_entries:
+                excess = entries - self.max_entries
+            if self.max_bytes is not None and total_bytes > self.max_bytes:
+                average_size = max(total_bytes // max(entries, 1), 1)
+                excess = max(excess, -(-(total_bytes - self.max_bytes) // average_size))
+            if excess == 0:
+                return
+            deleted = conn.execute(
+                "DELETE FROM sineps_cache WHERE key IN ("
+                "SELECT key FROM sineps_cache ORDER BY accessed_at LIMIT ?)",
+                (excess,),
+            ).rowcount
+            with self._lock:
+                self._evictions += deleted
+            if deleted == 0:
+                return
+
+    def items(self):
+        conn = self._connect()
+        now = time.time()
+        rows = conn.execute(
+            "SELECT key, value FROM sineps_cache "
+            "WHERE expires_at IS NULL OR expires_at > ?",
+            (now,),
+        )
+        for key, value in rows:
+            yield key, self._codec.loads(value)
+
+    def clear(self):
+        self._connect().execute("DELETE FROM sineps_cache")
+
+    def close(self):
+        for name in ("conn", "touch_conn"):
+            conn = getattr(self._local, name, None)
+            if conn is not None:
+                conn.close()
+                setattr(self._local, name, None)
+
+    def stats(self) -> dict:
+        entries, total_bytes = (
+            self._connect()
+            .execute("SELECT entries, bytes FROM sineps_cache_totals")
+            .fetchone()
+        )
+        with self._lock:
+            return {
+                "entries": entries,
+                "bytes": total_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "errors": self._errors,
+            }
@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from ._exceptions import CircuitOpenError
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+_FAILED = 1
+_SLOW = 2
+
+
+class _Circuit:
+    __slots__ = (
+        "state",
+        "outcomes",
+        "failures",
+        "slow",
+        "opened_at",
+        "trials",
+        "successes",
+        "rejected",
+        "times_opened",
+    )
+
+    def __init__(self, window: int):
+        self.state = CLOSED
+        self.outcomes = deque(maxlen=window)
+        self.failures = 0
+        self.slow = 0
+        self.opened_at = None
+        self.trials = 0
+        self.successes = 0
+        self.rejected = 0
+        self.times_opened = 0
+
+    def push(self, outcome: int):
+        if len(self.outcomes) == self.outcomes.maxlen:
+            oldest = self.outcomes.popleft()
+            self.failures -= oldest & _FAILED
+            self.slow -= (oldest & _SLOW) >> 1
+        self.outcomes.append(outcome)
+        self.failures += outcome & _FAILED
+        self.slow += (outcome & _SLOW) >> 1
+
+    def clear(self):
+        self.outcomes.clear()
+        self.failures = 0
+        self.slow = 0
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        slow_call_duration: float = None,
+        slow_call_rate: float = 0.5,
+        window: int = 100,
+        min_calls: int = 20,
+        open_duration: float = 30.0,
+        half_open_calls: int = 5,
+        failure_statuses=(500, 502, 503, 504),
+        fallback: Callable = None,
+    ):
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be between 0 and 1")
+        if not 0 < slow_call_rate <= 1:
+            raise ValueError("slow_call_rate must be between 0 and 1")
+        if min_calls < 1 or window < min_calls:
+            raise ValueError("window must be at least min_calls, which must be >= 1")
+        if half_open_calls < 1:
+            raise ValueError("half_open_calls must be at least 1")
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.slow_call_rate = slow_call_rate
+        self.window = window
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.failure_statuses = frozenset(failure_statuses)
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._circuits = {}
+
+    def _circuit(self, endpoint: str) -> _Circuit:
+        circuit = self._circuits.get(endpoint)
+        if circuit is None:
+            circuit = self._circuits[endpoint] = _Circuit(self.window)
+        return circuit
+
+    def _open(self, circuit: _Circuit, now: float):
+        circuit.state = OPEN
+        circuit.opened_at = now
+        circuit.times_opened += 1
+        circuit.clear()
+
+    def _reject(self, endpoint: str, circuit: _Circuit, now: float):
+        circuit.rejected += 1
+        retry_after = 0.0
+        if circuit.state == OPEN:
+            retry_after = max(0.0, circuit.opened_at + self.open_duration - now)
+        raise CircuitOpenError(
+            f"Circuit for {endpoint} is {circuit.state}",
+            endpoint=endpoint,
+            retry_after=retry_after,
+        )
+
+    def acquire(self, endpoint: str) -> Optional[str]:
+        # Returns the new state when this call moved the circuit to half-open.
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit(endpoint)
+            if circuit.state == CLOSED:
+                return None
+            transition = None
+            if circuit.state == OPEN:
+                if now - circuit.opened_at < self.open_duration:
+                    self._reject(endpoint, circuit, now)
+                circuit.state = transition = HALF_OPEN
+                circuit.trials = 0
+                circuit.successes = 0
+            if circuit.trials >= self.half_open_calls:
+                self._reject(endpoint, circuit, now)
+            circuit.trials += 1
+            return transition
+
+    def release(self, endpoint: str):
+        # A trial call ended without an outcome (for example, it was cancelled).
+        with self._lock:
+            circuit = self._circuit(endpoint)
+            if circuit.state == HALF_OPEN and circuit.trials > 0:
+                circuit.trials -= 1
+
+    def record(self, endpoint: str, status_code: int, latency: float) -> Optional[str]:
+        # Returns the new state when this outcome opened or closed the circuit.
+        outcome = 0
+        if status_code is None or status_code in self.failure_statuses:
+            outcome |= _FAILED
+        if self.slow_call_duration is not None and latency >= self.slow_call_duration:
+            outcome |= _SLOW
+        now = time.monotonic()
+        with self._lock:
+            circuit = self._circuit(endpoint)
+            if circuit.state == HALF_OPEN:
+                if outcome:
+                    self._open(circuit, now)
+                    return OPEN
+                circuit.successes += 1
+                if circuit.successes >= self.half_open_calls:
+                    circuit.state = CLOSED
+                    circuit.clear()
+                    return CLOSED
+                return None
+            if circuit.state == OPEN:
+                # A call that started before the circuit opened.
+                return None
+            circuit.push(outcome)
+            calls = len(circuit.outcomes)
+            if calls < self.min_calls:
+                return None
+            if circuit.failures / calls >= self.failure_rate or (
+                self.slow_call_duration is not None
+                and circuit.slow / calls >= self.slow_call_rate
+            ):
+                self._open(circuit, now)
+                return OPEN
+            return None
+
+    def state(self, endpoint: str) -> str:
+        with self._lock:
+            circuit = self._circuits.get(endpoint)
+            return circuit.state if circuit is not None else CLOSED
+
+    def reset(self, endpoint: str = None):
+        with self._lock:
+            if endpoint is None:
+                self._circuits = {}
+            else:
+                self._circuits.pop(endpoint, None)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for endpoint, circuit in self._circuits.items():
+                calls = len(circuit.outcomes)
+                retry_after = None
+                if circuit.state == OPEN:
+                    retry_after = max(0.0, circuit.opened_at + self.open_duration - now)
+                stats[endpoint] = {
+                    "state": circuit.state,
+                    "calls": calls,
+                    "failure_rate": circuit.failures / calls if calls else 0.0,
+                    "slow_call_rate": circuit.slow / calls if calls else 0.0,
+                    "rejected": circuit.rejected,
+                    "times_opened": circuit.times_opened,
+                    "retry_after": retry_after,
+                }
+            return stats
@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError
+
+from ._client import AsyncClient
+from ._exceptions import APIError
+from ._metrics import MetricsHook
+from ._rate_limit import RateLimiter
+from ._retry import RetryPolicy
+
+
+LATENCY_SAMPLE_SIZE = 100_000
+READ_AHEAD_LINES = 1024
+
+
+class _Checkpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self.input_lines = 0
+        self.output_offset = 0
+        self.ok = 0
+        self.errors = 0
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.input_lines = state["input_lines"]
+        self.output_offset = state["output_offset"]
+        self.ok = state["ok"]
+        self.errors = state["errors"]
+        return True
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "input_lines": self.input_lines,
+                    "output_offset": self.output_offset,
+                    "ok": self.ok,
+                    "errors": self.errors,
+                },
+                f,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+class _LatencySample:
+    def __init__(self, size: int = LATENCY_SAMPLE_SIZE):
+        self.size = size
+        self.count = 0
+        self.values = []
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.max = max(self.max, value)
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < self.size:
+                self.values[index] = value
+
+    def percentile(self, p: float) -> float:
+        if not self.values:
+            return 0.0
+        values = sorted(self.values)
+        return values[min(len(values) - 1, int(p / 100 * len(values)))]
+
+
+class _LatencyHook(MetricsHook):
+    def __init__(self, latencies: _LatencySample):
+        self.latencies = latencies
+
+    def request_finished(
+        self, endpoint, status_code, latency, request_bytes, response_bytes
+    ):
+        self.latencies.add(latency)
+
+
+def _load_json_file(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return json.load(f)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from e
+
+
+def _read_lines(input_file, loop, lines):
+    # Runs in a daemon thread so a slow stdin never blocks the event loop, and
+    # a pending read never keeps the process alive after Ctrl-C.
+    def put(item):
+        asyncio.run_coroutine_threadsafe(lines.put(item), loop).result()
+
+    try:
+        try:
+            for line in input_file:
+                put(line)
+        except (OSError, ValueError) as e:
+            put(e)
+            return
+        put(None)
+    except (RuntimeError, CancelledError):
+        # The event loop has already shut down.
+        pass
+
+
+def _parse_line(line: str):
+    record = json.loads(line)
+    if isinstance(record, str):
+        return record, None
+    if isinstance(record, dict) and "query" in record:
+        return record["query"], record.get("id")
+    raise ValueError("Each line must be a JSON string or an object with a 'query' key")
+
+
+def _format_route_result(response):
+    return {
+        "routes": [
+            {"index": route.index, "name": route.name}
+            for route in response.result.routes
+        ]
+    }
+
+
+def _format_filter_result(response):
+    if not response.result:
+        return {}
+    return response.result.to_dict()
+
+
+def _format_error(error):
+    return {"type": type(error).__name__, "message": str(error)}
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog="sineps",
+        description=(
+            "Run the Sineps intent router or filter extractor over JSONL queries."
+        ),
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    route = subparsers.add_parser("route", help="Route queries with the intent router")
+    route.add_argument("--routes", required=True, help="JSON file with the routes")
+    route.add_argument("--allow-none", action="store_true")
+
+    extract = subparsers.add_parser(
+        "extract", help="Extract filters with the filter extractor"
+    )
+    extract.add_argument("--field", required=True, help="JSON file with the field")
+    extract.add_argument("--required", action="store_true")
+
+    for subparser in (route, extract):
+        subparser.add_argument(
+            "-i", "--input", default="-", help="JSONL input file (default: stdin)"
+        )
+        subparser.add_argument(
+            "-o", "--output", default="-", help="JSONL output file (default: stdout)"
+        )
+        subparser.add_argument(
+            "--api-key", default=os.environ.get("SINEPS_API_KEY", "")
+        )
+        subparser.add_argument(
+            "--base-url",
+            default=os.environ.get("SINEPS_BASE_URL"),
+            help="API base URL (default: https://api.sineps.io)",
+        )
+        subparser.add_argument("-c", "--concurrency", type=int, default=16)
+        subparser.add_argument(
+            "--rate-limit", type=float, default=None, help="Max requests per second"
+        )
+        subparser.add_argument("--max-attempts", type=int, default=3)
+        subparser.add_argument(
+            "--checkpoint",
+            default=None,
+            help=(
+                "Checkpoint file "
+                "(default: <output>.checkpoint when writing to a file)"
+            ),
+        )
+        subparser.add_argument("--checkpoint-every", type=int, default=1000)
+        subparser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore an existing checkpoint and start from the first line",
+        )
+    return parser
+
+
+async def _run(args, checkpoint, input_file, output_file):
+    rate_limiter = RateLimiter(args.rate_limit, burst=1) if args.rate_limit else None
+    retry = RetryPolicy(max_attempts=args.max_attempts)
+    latencies = _LatencySample()
+    pending_lines = deque()
+
+    async def read_queries():
+        lines = asyncio.Queue(READ_AHEAD_LINES)
+        threading.Thread(
+            target=_read_lines,
+            args=(input_file, asyncio.get_running_loop(), lines),
+            daemon=True,
+        ).start()
+        line_number = -1
+        while True:
+            line = await lines.get()
+            if line is None:
+                return
+            if isinstance(line, Exception):
+                raise line
+            line_number += 1
+            if line_number < checkpoint.input_lines:
+                continue
+            if not line.strip():
+                pending_lines.append((line_number, None, None, None))
+                continue
+            try:
+                query, record_id = _parse_line(line)
+            except ValueError as e:
+                pending_lines.append((line_number, None, None, e))
+                continue
+            pending_lines.append((line_number, query, record_id, None))
+            yield query
+
+    async with AsyncClient(
+        args.api_key,
+        retry=retry,
+        rate_limiter=rate_limiter,
+        base_url=args.base_url,
+        metrics=_LatencyHook(latencies),
+    ) as client:
+        if args.command == "route":
+            stream = client.stream_intent_router(
+                read_queries(),
+                _load_json_file(args.routes),
+                args.allow_none,
+                concurrency=args.concurrency,
+                ordered=True,
+            )
+            format_result = _format_route_result
+        else:
+            stream = client.stream_filter_extractor(
+                read_queries(),
+                _load_json_file(args.field),
+                args.required,
+                concurrency=args.concurrency,
+                ordered=True,
+            )
+            format_result = _format_filter_result
+
+        def write(record):
+            output_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        def skip_lines():
+            while pending_lines and pending_lines[0][1] is None:
+                line_number, _, _, error = pending_lines.popleft()
+                if error is not None:
+                    checkpoint.errors += 1
+                    write({"line": line_number, "error": _format_error(error)})
+                checkpoint.input_lines = line_number + 1
+
+        since_checkpoint = 0
+        async for query, result in stream:
+            skip_lines()
+            line_number, _, record_id, _ = pending_lines.popleft()
+            record = {"line": line_number, "query": query}
+            if record_id is not None:
+                record["id"] = record_id
+            if isinstance(result, Exception):
+                checkpoint.errors += 1
+                record["error"] = _format_error(result)
+            else:
+                checkpoint.ok += 1
+                record["result"] = format_result(result)
+            write(record)
+            checkpoint.input_lines = line_number + 1
+
+            since_checkpoint += 1
+            if since_checkpoint >= args.checkpoint_every:
+                since_checkpoint = 0
+                output_file.flush()
+                if output_file is not sys.stdout:
+                    checkpoint.output_offset = output_file.tell()
+                checkpoint.save()
+
+        skip_lines()
+    return latencies
+
+
+def _print_summary(checkpoint, processed, elapsed, latencies):
+    throughput = processed / elapsed if elapsed > 0 else 0.0
+    lines = [
+        f"lines: {checkpoint.input_lines}",
+        f"ok: {checkpoint.ok}",
+        f"errors: {checkpoint.errors}",
+        f"elapsed: {elapsed:.2f}s",
+        f"throughput: {throughput:.1f} queries/s",
+        "request latency: p50={:.1f}ms p90={:.1f}ms p99={:.1f}ms max={:.1f}ms".format(
+            latencies.percentile(50) * 1000,
+            latencies.percentile(90) * 1000,
+            latencies.percentile(99) * 1000,
+            latencies.max * 1000,
+        ),
+    ]
+    print("\n".join(lines), file=sys.stderr)
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    if not args.api_key:
+        print(
+            "sineps: an API key is required (--api-key or SINEPS_API_KEY)",
+            file=sys.stderr,
+        )
+        return 2
+
+    checkpoint_path = args.checkpoint
+    if checkpoint_path is None and args.output != "-":
+        checkpoint_path = f"{args.output}.checkpoint"
+    checkpoint = _Checkpoint(checkpoint_path)
+    try:
+        if not args.restart and checkpoint.load():
+            print(
+                f"sineps: resuming after line {checkpoint.input_lines}",
+                file=sys.stderr,
+            )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"sineps: cannot read checkpoint {checkpoint_path}: {e}", file=sys.stderr)
+        return 1
+    start_ok, start_errors = checkpoint.ok, checkpoint.errors
+
+    input_file = output_file = None
+    start = time.perf_counter()
+    try:
+        if args.input == "-":
+            input_file = sys.stdin
+        else:
+            input_file = open(args.input, "r", encoding="utf-8")
+        if args.output == "-":
+            output_file = sys.stdout
+        else:
+            output_file = open(args.output, "a+", encoding="utf-8")
+            output_file.seek(checkpoint.output_offset)
+            output_file.truncate()
+        latencies = asyncio.run(_run(args, checkpoint, input_file, output_file))
+    except KeyboardInterrupt:
+        message = "sineps: interrupted"
+        if checkpoint.path:
+            message += f" after line {checkpoint.input_lines}; rerun to resume"
+        print(message, file=sys.stderr)
+        return 130
+    except (APIError, OSError, ValueError) as e:
+        print(f"sineps: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if output_file is not None:
+            output_file.flush()
+            if output_file is not sys.stdout:
+                checkpoint.output_offset = output_file.tell()
+                output_file.close()
+            checkpoint.save()
+        if input_file is not None and input_file is not sys.stdin:
+            input_file.close()
+
+    processed = checkpoint.ok + checkpoint.errors - start_ok - start_errors
+    _print_summary(checkpoint, processed, time.perf_counter() - start, latencies)
+    return 0
@@ -1,11 +1,52 @@
 import logging
-from typing import Union, List
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Union,
+)
 
-from ._rest_adapter import RestAdapter, AsyncRestAdapter
-from ._validate import validate_intent_router_format, validate_filter_extractor_format
-from .intent_router import IntentRouterResponse, Routes
+from ._rest_adapter import RestAdapter, AsyncRestAdapter, Response
+from ._cache import BaseCache, make_cache_key, normalize_query
+from ._retry import RetryPolicy
+from ._hedge import HedgePolicy
+from ._circuit_breaker import CircuitBreaker
+from ._local_router import LocalRouter
+from ._rate_limit import RateLimiter
+from ._single_flight import SingleFlight, AsyncSingleFlight
+from ._utils import hash_payload
+from ._codec import JSONCodec, get_codec
+from ._metrics import MetricsHook
+from ._transport import BaseTransport
+from ._timeout import DEFAULT_TIMEOUT, Timeout, deadline_at, get_timeout
+from ._validate import (
+    validate_filter_extractor_format,
+    validate_intent_router_query,
+    validate_intent_router_allow_none,
+    validate_filter_extractor_query,
+    validate_filter_extractor_required,
+    validate_field,
+)
+from .intent_router import (
+    IntentRouterResponse,
+    Routes,
+    CompiledRoutes,
+    CompiledRouteGroups,
+    Tournament,
+    compile_routes,
+    compile_route_groups,
+)
 from .filter_extractor import FilterExtractorResponse
-from ._exceptions import APIError, APIConnectionError
+from ._exceptions import APIError, APIConnectionError, APIStatusError
+
+
+__all__ = ["BaseClient", "Client", "AsyncClient"]
 
 
 class BaseClient:
@@ -17,7 +58,28 @@ class BaseClient:
         logger: logging.Logger = None,
         adapter_class=None,
         exception_class=None,
+        cache: BaseCache = None,
+        retry: RetryPolicy = None,
+        rate_limiter: RateLimiter = None,
+        single_flight=None,
+        json_codec: Union[str, JSONCodec] = "auto",
+        metrics: MetricsHook = None,
+        base_url: str = None,
+        timeout: Union[float, Timeout] = DEFAULT_TIMEOUT,
+        deadline: float = None,
+        circuit_breaker: CircuitBreaker = None,
+        local_router: LocalRouter = None,
+        **adapter_kwargs,
     ):
+        if deadline is not None and deadline <= 0:
+            raise ValueError("deadline must be positive")
+        self._ver = ver
+        self._deadline = deadline
+        self._codec = get_codec(json_codec)
+        self._cache = cache
+        self._single_flight = single_flight
+        self._metrics = metrics
+        self._local_router = local_router
         self._rest_adapter = adapter_class(
             hostname="api.sineps.io",
             api_key=api_key,
@@ -25,8 +87,18 @@ class BaseClient:
             ssl_verify=ssl_verify,
             logger=logger,
             exception_class=exception_class,
+            retry=retry,
+            rate_limiter=rate_limiter,
+            codec=self._codec,
+            metrics=metrics,
+            base_url=base_url,
+            timeout=get_timeout(timeout),
+            circuit_breaker=circuit_breaker,
+            **adapter_kwargs,
         )
         self._check_api_key()
+        if metrics is not None:
+            metrics.attach_pool(self.pool_stats)
 
     def _check_api_key(self):
         if not self._rest_adapter._api_key:
@@ -37,19 +109,109 @@ class BaseClient:
         query: str,
         routes: Union[Routes, List[dict]] = [],
         allow_none: bool = False,
-    ):
-        if isinstance(routes, Routes):
-            routes = routes.to_dict()
-        validate_intent_router_format(query, routes, allow_none)
-        data = {"query": query, "routes": routes, "allow_none": allow_none}
-        return data
+    ) -> CompiledRoutes:
+        validate_intent_router_query(query)
+        return self._prepare_intent_router_many(routes, allow_none)
 
     def exec_filter_extractor(
         self, query: str, field: dict = {}, required: bool = False
     ):
         validate_filter_extractor_format(query, field, required)
         data = {"query": query, "field": field, "required": required}
-        return data
+        return self._codec.dumps(data)
+
+    def _intent_router_cache_key(self, query, routes, allow_none):
+        if self._cache is None:
+            return None
+        return make_cache_key(
+            self._ver, normalize_query(query), routes.hash, allow_none
+        )
+
+    def _match_locally(self, query, routes):
+        if self._local_router is None:
+            return None
+        match = self._local_router.match(query, routes)
+        if match is not None and self._metrics is not None:
+            self._metrics.local_route(
+                "/intent-router", match.confident and not match.verify
+            )
+        return match
+
+    def _local_response(self, match, routes):
+        if match is None or not match.confident or match.verify:
+            return None
+        route = {"index": match.index, "name": routes.routes[match.index].name}
+        return Response(200, message="Success", data={"result": {"routes": [route]}})
+
+    def _record_local_match(self, match, result, response):
+        if match is not None and not result.fallback:
+            self._local_router.record(match, response.indices)
+
+    def local_router_stats(self):
+        if self._local_router is None:
+            return None
+        return self._local_router.stats()
+
+    def pool_stats(self):
+        return self._rest_adapter.pool_stats()
+
+    def _expires_at(self, deadline):
+        return deadline_at(deadline if deadline is not None else self._deadline)
+
+    def _get_cached_response(self, endpoint, cache_key):
+        if cache_key is None:
+            return None
+        cached = self._cache.get(cache_key)
+        if self._metrics is not None:
+            self._metrics.cache_lookup(endpoint, cached is not None)
+        if cached is None:
+            return None
+        return Response(200, message="Success", data=cached)
+
+    def _set_cached_response(self, cache_key, response):
+        if cache_key is not None and not response.fallback:
+            self._cache.set(cache_key, response.data)
+
+    def _single_flight_key(self, endpoint, data):
+        if self._single_flight is None:
+            return None
+        return (endpoint, hash_payload(data))
+
+    def circuit_stats(self):
+        if self._rest_adapter._circuit_breaker is None:
+            return None
+        return self._rest_adapter._circuit_breaker.stats()
+
+    def coalescing_stats(self):
+        if self._single_flight is None:
+            return None
+        return self._single_flight.stats()
+
+    def _prepare_route_groups(self, query, routes, allow_none, max_calls):
+        validate_intent_router_query(query)
+        validate_intent_router_allow_none(allow_none)
+        if max_calls is not None and max_calls < 1:
+            raise ValueError("max_calls must be at least 1")
+        return compile_route_groups(routes)
+
+    def _start_tournament(self, query, groups, max_calls):
+        index = None
+        if self._local_router is not None:
+            index = self._local_router.index(groups)
+        return Tournament(groups, groups.first_round(query, max_calls, index))
+
+    def _prepare_intent_router_many(self, routes, allow_none):
+        validate_intent_router_allow_none(allow_none)
+        return compile_routes(routes)
+
+    def _prepare_filter_extractor_many(self, field, required):
+        validate_filter_extractor_required(required)
+        validate_field(field)
+        return field
+
+    def _filter_extractor_many_data(self, query, field, required):
+        validate_filter_extractor_query(query)
+        return self._codec.dumps({"query": query, "field": field, "required": required})
 
 
 class Client(BaseClient):
@@ -59,6 +221,22 @@ class Client(BaseClient):
         ver: str = "v1",
         ssl_verify: bool = True,
         logger: logging.Logger = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        pool_idle_timeout: float = None,
+        cache: BaseCache = None,
+        retry: RetryPolicy = None,
+        rate_limiter: RateLimiter = None,
+        coalesce: bool = False,
+        json_codec: Union[str, JSONCodec] = "auto",
+        metrics: MetricsHook = None,
+        base_url: str = None,
+        transport: Union[str, BaseTransport] = None,
+        timeout: Union[float, Timeout] = DEFAULT_TIMEOUT,
+        deadline: float = None,
+        circuit_breaker: CircuitBreaker = None,
+        local_router: LocalRouter = None,
     ):
         super().__init__(
             api_key,
@@ -67,25 +245,233 @@ class Client(BaseClient):
             logger,
             RestAdapter,
             exception_class=APIConnectionError,
+            cache=cache,
+            retry=retry,
+            rate_limiter=rate_limiter,
+            single_flight=SingleFlight() if coalesce else None,
+            json_codec=json_codec,
+            metrics=metrics,
+            base_url=base_url,
+            transport=transport,
+            timeout=timeout,
+            deadline=deadline,
+            circuit_breaker=circuit_breaker,
+            local_router=local_router,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            pool_idle_timeout=pool_idle_timeout,
         )
 
+    def close(self):
+        self._rest_adapter.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def exec_intent_router(
         self,
         query: str,
         routes: Union[Routes, List[dict]] = [],
         allow_none: bool = False,
+        deadline: float = None,
     ):
-        data = super().exec_intent_router(query, routes, allow_none)
-        result = self._rest_adapter.post("/intent-router", data=data)
-        return IntentRouterResponse(result, routes)
+        routes = super().exec_intent_router(query, routes, allow_none)
+        return self._intent_router(
+            query, routes, allow_none, self._expires_at(deadline)
+        )
+
+    def _intent_router(self, query, routes, allow_none, expires_at=None):
+        cache_key = self._intent_router_cache_key(query, routes, allow_none)
+        result = self._get_cached_response("/intent-router", cache_key)
+        if result is not None:
+            return IntentRouterResponse(result, routes)
+        match = self._match_locally(query, routes)
+        result = self._local_response(match, routes)
+        if result is not None:
+            return IntentRouterResponse(result, routes)
+        result = self._post(
+            "/intent-router",
+            routes.request_body(query, allow_none, self._codec),
+            cache_key,
+            expires_at,
+        )
+        response = IntentRouterResponse(result, routes)
+        self._record_local_match(match, result, response)
+        return response
+
+    def exec_intent_router_hierarchical(
+        self,
+        query: str,
+        routes: Union[CompiledRouteGroups, Routes, List[dict]] = [],
+        allow_none: bool = False,
+        max_calls: int = None,
+        max_concurrency: int = None,
+        deadline: float = None,
+    ):
+        groups = self._prepare_route_groups(query, routes, allow_none, max_calls)
+        expires_at = self._expires_at(deadline)
+        match = self._match_locally(query, groups)
+        result = self._local_response(match, groups)
+        if result is not None:
+            return IntentRouterResponse(result, groups)
+
+        def run(group):
+            return self._route_group(query, group[1], allow_none, expires_at)
+
+        tournament = self._start_tournament(query, groups, max_calls)
+        workers = max_concurrency or len(tournament.round)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while tournament.round:
+                tournament.advance(list(executor.map(run, tournament.round)))
+        result = tournament.response()
+        response = IntentRouterResponse(result, groups)
+        self._record_local_match(match, result, response)
+        return response
+
+    def _route_group(self, query, routes, allow_none, expires_at):
+        cache_key = self._intent_router_cache_key(query, routes, allow_none)
+        result = self._get_cached_response("/intent-router", cache_key)
+        if result is None:
+            result = self._post(
+                "/intent-router",
+                routes.request_body(query, allow_none, self._codec),
+                cache_key,
+                expires_at,
+            )
+        return result
 
     def exec_filter_extractor(
-        self, query: str, field: dict = {}, required: bool = False
+        self,
+        query: str,
+        field: dict = {},
+        required: bool = False,
+        deadline: float = None,
     ):
         data = super().exec_filter_extractor(query, field, required)
-        result = self._rest_adapter.post("/filter-extractor", data=data)
+        result = self._post(
+            "/filter-extractor", data, expires_at=self._expires_at(deadline)
+        )
         return FilterExtractorResponse(result)
 
+    def _post(self, endpoint, data, cache_key=None, expires_at=None):
+        def fetch():
+            result = self._rest_adapter.post(endpoint, data=data, expires_at=expires_at)
+            self._set_cached_response(cache_key, result)
+            return result
+
+        single_flight_key = self._single_flight_key(endpoint, data)
+        if single_flight_key is None:
+            return fetch()
+        return self._single_flight.do(single_flight_key, fetch, expires_at)
+
+    def _stream(self, fn, inputs, concurrency, ordered):
+        def run(query):
+            try:
+                return fn(query)
+            except Exception as e:
+                return e
+
+        inputs = iter(inputs)
+        pending = deque() if ordered else {}
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            try:
+                for query in inputs:
+                    future = executor.submit(run, query)
+                    if ordered:
+                        pending.append((query, future))
+                    else:
+                        pending[future] = query
+                    if len(pending) < concurrency:
+                        continue
+                    yield from self._drain(pending, ordered)
+                while pending:
+                    yield from self._drain(pending, ordered)
+            finally:
+                for future in pending:
+                    if ordered:
+                        future = future[1]
+                    future.cancel()
+
+    def _drain(self, pending, ordered):
+        if ordered:
+            query, future = pending.popleft()
+            yield query, future.result()
+            return
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future.result()
+
+    def _intent_router_runner(self, routes, allow_none):
+        routes = self._prepare_intent_router_many(routes, allow_none)
+
+        def run(query):
+            validate_intent_router_query(query)
+            return self._intent_router(
+                query, routes, allow_none, self._expires_at(None)
+            )
+
+        return run
+
+    def _filter_extractor_runner(self, field, required):
+        field = self._prepare_filter_extractor_many(field, required)
+
+        def run(query):
+            data = self._filter_extractor_many_data(query, field, required)
+            result = self._post(
+                "/filter-extractor", data, expires_at=self._expires_at(None)
+            )
+            return FilterExtractorResponse(result)
+
+        return run
+
+    def exec_intent_router_many(
+        self,
+        queries: List[str],
+        routes: Union[Routes, List[dict]] = [],
+        allow_none: bool = False,
+        max_concurrency: int = 8,
+    ):
+        run = self._intent_router_runner(routes, allow_none)
+        stream = self._stream(run, queries, max_concurrency, ordered=True)
+        return [result for _, result in stream]
+
+    def exec_filter_extractor_many(
+        self,
+        queries: List[str],
+        field: dict = {},
+        required: bool = False,
+        max_concurrency: int = 8,
+    ):
+        run = self._filter_extractor_runner(field, required)
+        stream = self._stream(run, queries, max_concurrency, ordered=True)
+        return [result for _, result in stream]
+
+    def stream_intent_router(
+        self,
+        queries: Iterable[str],
+        routes: Union[Routes, List[dict]] = [],
+        allow_none: bool = False,
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> Iterator[Tuple[str, Union[IntentRouterResponse, Exception]]]:
+        run = self._intent_router_runner(routes, allow_none)
+        return self._stream(run, queries, concurrency, ordered)
+
+    def stream_filter_extractor(
+        self,
+        queries: Iterable[str],
+        field: dict = {},
+        required: bool = False,
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> Iterator[Tuple[str, Union[FilterExtractorResponse, Exception]]]:
+        run = self._filter_extractor_runner(field, required)
+        return self._stream(run, queries, concurrency, ordered)
+
 
 class AsyncClient(BaseClient):
     def __init__(
@@ -94,6 +480,23 @@ class AsyncClient(BaseClient):
         ver: str = "v1",
         ssl_verify: bool = True,
         logger: logging.Logger = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: int = 10,
+        cache: BaseCache = None,
+        retry: RetryPolicy = None,
+        rate_limiter: RateLimiter = None,
+        coalesce: bool = False,
+        json_codec: Union[str, JSONCodec] = "auto",
+        metrics: MetricsHook = None,
+        base_url: str = None,
+        transport: Union[str, BaseTransport] = None,
+        timeout: Union[float, Timeout] = DEFAULT_TIMEOUT,
+        deadline: float = None,
+        circuit_breaker: CircuitBreaker = None,
+        local_router: LocalRouter = None,
+        hedge: HedgePolicy = None,
     ):
         super().__init__(
             api_key,
@@ -102,21 +505,320 @@ class AsyncClient(BaseClient):
             logger,
             AsyncRestAdapter,
             exception_class=APIConnectionError,
+            cache=cache,
+            retry=retry,
+            rate_limiter=rate_limiter,
+            single_flight=AsyncSingleFlight() if coalesce else None,
+            json_codec=json_codec,
+            metrics=metrics,
+            base_url=base_url,
+            transport=transport,
+            timeout=timeout,
+            deadline=deadline,
+            circuit_breaker=circuit_breaker,
+            local_router=local_router,
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=ttl_dns_cache,
         )
+        self._hedge = hedge
+
+    async def aclose(self):
+        await self._rest_adapter.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
 
     async def exec_intent_router(
         self,
         query: str,
         routes: Union[Routes, List[dict]] = [],
         allow_none: bool = False,
+        deadline: float = None,
     ):
-        data = super().exec_intent_router(query, routes, allow_none)
-        result = await self._rest_adapter.post("/intent-router", data=data)
-        return IntentRouterResponse(result, routes)
+        routes = super().exec_intent_router(query, routes, allow_none)
+        return await self._intent_router(
+            query, routes, allow_none, self._expires_at(deadline)
+        )
+
+    async def _intent_router(self, query, routes, allow_none, expires_at=None):
+        cache_key = self._intent_router_cache_key(query, routes, allow_none)
+        result = self._get_cached_response("/intent-router", cache_key)
+        if result is not None:
+            return IntentRouterResponse(result, routes)
+        match = self._match_locally(query, routes)
+        result = self._local_response(match, routes)
+        if result is not None:
+            return IntentRouterResponse(result, routes)
+        result = await self._post(
+            "/intent-router",
+            routes.request_body(query, allow_none, self._codec),
+            cache_key,
+            expires_at,
+        )
+        response = IntentRouterResponse(result, routes)
+        self._record_local_match(match, result, response)
+        return response
+
+    async def exec_intent_router_hierarchical(
+        self,
+        query: str,
+        routes: Union[CompiledRouteGroups, Routes, List[dict]] = [],
+        allow_none: bool = False,
+        max_calls: int = None,
+        max_concurrency: int = None,
+        deadline: float = None,
+    ):
+        import asyncio
+
+        groups = self._prepare_route_groups(query, routes, allow_none, max_calls)
+        expires_at = self._expires_at(deadline)
+        match = self._match_locally(query, groups)
+        result = self._local_response(match, groups)
+        if result is not None:
+            return IntentRouterResponse(result, groups)
+
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def run(group):
+            if semaphore is None:
+                return await self._route_group(query, group[1], allow_none, expires_at)
+            async with semaphore:
+                return await self._route_group(query, group[1], allow_none, expires_at)
+
+        tournament = self._start_tournament(query, groups, max_calls)
+        while tournament.round:
+            tasks = [asyncio.ensure_future(run(group)) for group in tournament.round]
+            try:
+                tournament.advance(await asyncio.gather(*tasks))
+            finally:
+                for task in tasks:
+                    task.cancel()
+        result = tournament.response()
+        response = IntentRouterResponse(result, groups)
+        self._record_local_match(match, result, response)
+        return response
+
+    async def _route_group(self, query, routes, allow_none, expires_at):
+        cache_key = self._intent_router_cache_key(query, routes, allow_none)
+        result = self._get_cached_response("/intent-router", cache_key)
+        if result is None:
+            result = await self._post(
+                "/intent-router",
+                routes.request_body(query, allow_none, self._codec),
+                cache_key,
+                expires_at,
+            )
+        return result
 
     async def exec_filter_extractor(
-        self, query: str, field: dict = {}, required: bool = False
+        self,
+        query: str,
+        field: dict = {},
+        required: bool = False,
+        deadline: float = None,
     ):
         data = super().exec_filter_extractor(query, field, required)
-        result = await self._rest_adapter.post("/filter-extractor", data=data)
+        result = await self._post(
+            "/filter-extractor", data, expires_at=self._expires_at(deadline)
+        )
         return FilterExtractorResponse(result)
+
+    async def _post(self, endpoint, data, cache_key=None, expires_at=None):
+        async def fetch():
+            if self._hedge is None:
+                result = await self._rest_adapter.post(
+                    endpoint, data=data, expires_at=expires_at
+                )
+            else:
+                result = await self._hedged_post(endpoint, data, expires_at)
+            self._set_cached_response(cache_key, result)
+            return result
+
+        single_flight_key = self._single_flight_key(endpoint, data)
+        if single_flight_key is None:
+            return await fetch()
+        return await self._single_flight.do(single_flight_key, fetch, expires_at)
+
+    async def _hedged_post(self, endpoint, data, expires_at):
+        import asyncio
+
+        hedge = self._hedge
+        hedge.record_call(endpoint)
+
+        async def attempt():
+            start = time.perf_counter()
+            result = await self._rest_adapter.post(
+                endpoint, data=data, expires_at=expires_at
+            )
+            hedge.observe(endpoint, time.perf_counter() - start)
+            return result
+
+        tasks = [asyncio.ensure_future(attempt())]
+        try:
+            delay = hedge.get_delay(endpoint)
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+            if delay is None or tasks[0].done() or not hedge.try_acquire():
+                return await tasks[0]
+            tasks.append(asyncio.ensure_future(attempt()))
+            return await self._first_success(endpoint, tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _first_success(self, endpoint, tasks):
+        import asyncio
+
+        error = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in sorted(done, key=tasks.index):
+                e = task.exception()
+                if e is None:
+                    self._record_hedge(endpoint, task is not tasks[0])
+                    return task.result()
+                if isinstance(e, APIStatusError) and e.status_code in (400, 401, 402):
+                    # The other request would be rejected the same way.
+                    error, pending = e, ()
+                    break
+                if error is None:
+                    error = e
+        self._record_hedge(endpoint, False)
+        raise error
+
+    def _record_hedge(self, endpoint, won):
+        self._hedge.record_hedge(endpoint, won)
+        if self._metrics is not None:
+            self._metrics.hedge(endpoint, won)
+
+    def hedge_stats(self):
+        if self._hedge is None:
+            return None
+        return self._hedge.stats()
+
+    async def _stream(self, fn, inputs, concurrency, ordered):
+        import asyncio
+
+        async def run(query):
+            try:
+                return await fn(query)
+            except Exception as e:
+                return e
+
+        pending = deque() if ordered else {}
+        try:
+            async for query in _aiter(inputs):
+                task = asyncio.ensure_future(run(query))
+                if ordered:
+                    pending.append((query, task))
+                else:
+                    pending[task] = query
+                if len(pending) < concurrency:
+                    continue
+                async for item in self._drain(pending, ordered):
+                    yield item
+            while pending:
+                async for item in self._drain(pending, ordered):
+                    yield item
+        finally:
+            for task in pending:
+                if ordered:
+                    task = task[1]
+                task.cancel()
+
+    async def _drain(self, pending, ordered):
+        if ordered:
+            query, task = pending[0]
+            result = await task
+            pending.popleft()
+            yield query, result
+            return
+        import asyncio
+
+        done, _ = await asyncio.wait(list(pending), return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield pending.pop(task), task.result()
+
+    def _intent_router_runner(self, routes, allow_none):
+        routes = self._prepare_intent_router_many(routes, allow_none)
+
+        async def run(query):
+            validate_intent_router_query(query)
+            return await self._intent_router(
+                query, routes, allow_none, self._expires_at(None)
+            )
+
+        return run
+
+    def _filter_extractor_runner(self, field, required):
+        field = self._prepare_filter_extractor_many(field, required)
+
+        async def run(query):
+            data = self._filter_extractor_many_data(query, field, required)
+            result = await self._post(
+                "/filter-extractor", data, expires_at=self._expires_at(None)
+            )
+            return FilterExtractorResponse(result)
+
+        return run
+
+    async def exec_intent_router_many(
+        self,
+        queries: List[str],
+        routes: Union[Routes, List[dict]] = [],
+        allow_none: bool = False,
+        max_concurrency: int = 8,
+    ):
+        run = self._intent_router_runner(routes, allow_none)
+        stream = self._stream(run, queries, max_concurrency, ordered=True)
+        return [result async for _, result in stream]
+
+    async def exec_filter_extractor_many(
+        self,
+        queries: List[str],
+        field: dict = {},
+        required: bool = False,
+        max_concurrency: int = 8,
+    ):
+        run = self._filter_extractor_runner(field, required)
+        stream = self._stream(run, queries, max_concurrency, ordered=True)
+        return [result async for _, result in stream]
+
+    def stream_intent_router(
+        self,
+        queries: Union[Iterable[str], AsyncIterable[str]],
+        routes: Union[Routes, List[dict]] = [],
+        allow_none: bool = False,
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> AsyncIterator[Tuple[str, Union[IntentRouterResponse, Exception]]]:
+        run = self._intent_router_runner(routes, allow_none)
+        return self._stream(run, queries, concurrency, ordered)
+
+    def stream_filter_extractor(
+        self,
+        queries: Union[Iterable[str], AsyncIterable[str]],
+        field: dict = {},
+        required: bool = False,
+        concurrency: int = 8,
+        ordered: bool = False,
+    ) -> AsyncIterator[Tuple[str, Union[FilterExtractorResponse, Exception]]]:
+        run = self._filter_extractor_runner(field, required)
+        return self._stream(run, queries, concurrency, ordered)
+
+
+async def _aiter(inputs):
+    if hasattr(inputs, "__aiter__"):
+        async for item in inputs:
+            yield item
+    else:
+        for item in inputs:
+            yield item
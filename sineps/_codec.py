@@ -0,0 +1,90 @@
+import json
+
+
+INDENT = 2
+
+
+class JSONCodec:
+    name = "json"
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+    def dumps_pretty(self, obj, indent: int = INDENT) -> str:
+        return json.dumps(obj, indent=indent, ensure_ascii=False)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: bytes):
+        return self._orjson.loads(data)
+
+    def dumps_pretty(self, obj, indent: int = INDENT) -> str:
+        if indent != 2:
+            return super().dumps_pretty(obj, indent)
+        return self._orjson.dumps(obj, option=self._orjson.OPT_INDENT_2).decode("utf-8")
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+
+        self._ujson = ujson
+
+    def dumps(self, obj) -> bytes:
+        return self._ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return self._ujson.loads(data)
+
+    def dumps_pretty(self, obj, indent: int = INDENT) -> str:
+        return self._ujson.dumps(obj, indent=indent, ensure_ascii=False)
+
+
+CODECS = {
+    "json": JSONCodec,
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+}
+
+_default_codec = None
+
+
+def get_codec(codec="auto") -> JSONCodec:
+    if isinstance(codec, JSONCodec):
+        return codec
+    if codec == "auto":
+        try:
+            return OrjsonCodec()
+        except ImportError:
+            return JSONCodec()
+    if codec not in CODECS:
+        raise ValueError(f"Unknown JSON codec: {codec!r}")
+    return CODECS[codec]()
+
+
+def default_codec() -> JSONCodec:
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = get_codec("auto")
+    return _default_codec
+
+
+def dumps_pretty(obj, indent: int = INDENT) -> str:
+    return default_codec().dumps_pretty(obj, indent)
@@ -22,6 +22,14 @@ class InvalidFilterExtractorFormatError(FilterExtractorError):
     pass
 
 
+class CircuitOpenError(APIError):
+    def __init__(self, message: str, endpoint: str, retry_after: float):
+        super().__init__(message)
+        self.message = message
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
 class APIStatusError(APIError):
     def __init__(self, text: str, status_code: int, message: str):
         super().__init__(text)
@@ -33,10 +41,22 @@ class APIConnectionError(APIError):
     pass
 
 
+class APITimeoutError(APIConnectionError):
+    pass
+
+
 class RestAdapterError(APIError):
     pass
 
 
+class TransportError(APIConnectionError):
+    pass
+
+
+class TransportTimeoutError(TransportError):
+    pass
+
+
 class InternalServerError(APIStatusError):
     pass
 
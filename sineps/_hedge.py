@@ -0,0 +1,114 @@
+import threading
+from collections import deque
+
+from ._retry import RetryBudget
+
+
+class _LatencyWindow:
+    __slots__ = ("samples", "quantile", "recompute_every", "_value", "_stale")
+
+    def __init__(self, size: int, quantile: float):
+        self.samples = deque(maxlen=size)
+        self.quantile = quantile
+        # Sorting the window on every call would cost more than it saves.
+        self.recompute_every = max(1, size // 20)
+        self._value = None
+        self._stale = 0
+
+    def observe(self, latency: float):
+        self.samples.append(latency)
+        self._stale += 1
+
+    def value(self) -> float:
+        if self._value is None or self._stale >= self.recompute_every:
+            ordered = sorted(self.samples)
+            index = min(len(ordered) - 1, int(self.quantile * len(ordered)))
+            self._value = ordered[index]
+            self._stale = 0
+        return self._value
+
+
+class HedgePolicy:
+    def __init__(
+        self,
+        delay: float = None,
+        quantile: float = 0.95,
+        max_ratio: float = 0.1,
+        window: int = 1000,
+        min_samples: int = 100,
+        min_delay: float = 0.005,
+    ):
+        if delay is not None and delay < 0:
+            raise ValueError("delay must be >= 0")
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if not 0 <= max_ratio <= 1:
+            raise ValueError("max_ratio must be between 0 and 1")
+        self.delay = delay
+        self.quantile = quantile
+        self.max_ratio = max_ratio
+        self.window = window
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        # Every call earns max_ratio of a hedge, so at most that fraction of
+        # calls (after a small initial burst) sends a duplicate.
+        self.budget = RetryBudget(
+            ratio=max_ratio, min_retries_per_second=0.0, max_tokens=10.0
+        )
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._counts = {}
+
+    def _count(self, endpoint: str) -> dict:
+        counts = self._counts.get(endpoint)
+        if counts is None:
+            counts = self._counts[endpoint] = {"calls": 0, "hedged": 0, "wins": 0}
+        return counts
+
+    def record_call(self, endpoint: str):
+        self.budget.record_request()
+        with self._lock:
+            self._count(endpoint)["calls"] += 1
+
+    def observe(self, endpoint: str, latency: float):
+        if self.delay is not None:
+            return
+        with self._lock:
+            window = self._latencies.get(endpoint)
+            if window is None:
+                window = _LatencyWindow(self.window, self.quantile)
+                self._latencies[endpoint] = window
+            window.observe(latency)
+
+    def get_delay(self, endpoint: str) -> float:
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            window = self._latencies.get(endpoint)
+            if window is None or len(window.samples) < self.min_samples:
+                return None
+            return max(self.min_delay, window.value())
+
+    def try_acquire(self) -> bool:
+        return self.budget.try_acquire()
+
+    def record_hedge(self, endpoint: str, won: bool):
+        with self._lock:
+            counts = self._count(endpoint)
+            counts["hedged"] += 1
+            if won:
+                counts["wins"] += 1
+
+    def stats(self) -> dict:
+        endpoints = {}
+        with self._lock:
+            for endpoint, counts in self._counts.items():
+                calls, hedged = counts["calls"], counts["hedged"]
+                endpoints[endpoint] = dict(
+                    counts,
+                    hedge_rate=hedged / calls if calls else 0.0,
+                    win_rate=counts["wins"] / hedged if hedged else 0.0,
+                )
+        for endpoint, stats in endpoints.items():
+            stats["delay"] = self.get_delay(endpoint)
+        return {"endpoints": endpoints, "skipped": self.budget.stats()["rejected"]}
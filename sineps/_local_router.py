@@ -0,0 +1,188 @@
+import math
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Optional, Tuple
+
+from ._cache import normalize_query
+
+
+def _ngrams(text: str, ngram_range: Tuple[int, int]) -> Counter:
+    text = f" {normalize_query(text).lower()} "
+    low, high = ngram_range
+    grams = Counter()
+    for n in range(low, high + 1):
+        for i in range(len(text) - n + 1):
+            grams[text[i : i + n]] += 1
+    return grams
+
+
+class LexicalIndex:
+    __slots__ = (
+        "ngram_range",
+        "num_routes",
+        "_doc_routes",
+        "_postings",
+        "_idf",
+        "_unseen_idf",
+    )
+
+    def __init__(self, routes, ngram_range: Tuple[int, int] = (3, 5)):
+        self.ngram_range = ngram_range
+        self.num_routes = len(routes.routes)
+        documents = []
+        doc_routes = []
+        for route in routes.routes:
+            for text in (route.name, route.description, *route.utterances):
+                if text:
+                    documents.append(_ngrams(text, ngram_range))
+                    doc_routes.append(route.index)
+
+        df = Counter()
+        for grams in documents:
+            df.update(grams.keys())
+        num_docs = len(documents)
+        self._idf = {
+            gram: math.log((1 + num_docs) / (1 + count)) + 1.0
+            for gram, count in df.items()
+        }
+        # Grams the index has never seen are as rare as they get.
+        self._unseen_idf = math.log(1 + num_docs) + 1.0
+
+        postings = {}
+        for doc, grams in enumerate(documents):
+            weights = {gram: tf * self._idf[gram] for gram, tf in grams.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values()))
+            for gram, weight in weights.items():
+                postings.setdefault(gram, []).append((doc, weight / norm))
+        self._postings = {gram: tuple(docs) for gram, docs in postings.items()}
+        self._doc_routes = tuple(doc_routes)
+
+    def scores(self, query: str) -> List[float]:
+        # Cosine similarity of the query with the closest text of each route.
+        grams = _ngrams(query, self.ngram_range)
+        unseen = self._unseen_idf
+        weights = {gram: tf * self._idf.get(gram, unseen) for gram, tf in grams.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        route_scores = [0.0] * self.num_routes
+        if not norm:
+            return route_scores
+        doc_scores = {}
+        for gram, weight in weights.items():
+            for doc, doc_weight in self._postings.get(gram, ()):
+                doc_scores[doc] = doc_scores.get(doc, 0.0) + weight * doc_weight
+        doc_routes = self._doc_routes
+        for doc, score in doc_scores.items():
+            route = doc_routes[doc]
+            score /= norm
+            if score > route_scores[route]:
+                route_scores[route] = score
+        return route_scores
+
+
+class LocalMatch:
+    __slots__ = ("index", "score", "margin", "confident", "verify")
+
+    def __init__(
+        self, index: int, score: float, margin: float, confident: bool, verify: bool
+    ):
+        self.index = index
+        self.score = score
+        self.margin = margin
+        self.confident = confident
+        self.verify = verify
+
+
+class LocalRouter:
+    def __init__(
+        self,
+        min_score: float = 0.75,
+        margin: float = 0.2,
+        ngram_range: Tuple[int, int] = (3, 5),
+        verify_rate: float = 0.0,
+        max_indexes: int = 32,
+    ):
+        if not 0 < min_score <= 1:
+            raise ValueError("min_score must be between 0 and 1")
+        if not 0 <= margin < 1:
+            raise ValueError("margin must be between 0 and 1")
+        if not 1 <= ngram_range[0] <= ngram_range[1]:
+            raise ValueError("ngram_range must be an increasing pair of sizes >= 1")
+        if not 0 <= verify_rate <= 1:
+            raise ValueError("verify_rate must be between 0 and 1")
+        self.min_score = min_score
+        self.margin = margin
+        self.ngram_range = tuple(ngram_range)
+        self.verify_rate = verify_rate
+        self.max_indexes = max_indexes
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+        self._confident = 0
+        self._counts = {
+            "queries": 0,
+            "local_hits": 0,
+            "verified": 0,
+            "verified_agreed": 0,
+            "ambiguous": 0,
+            "ambiguous_agreed": 0,
+        }
+
+    def index(self, routes) -> LexicalIndex:
+        with self._lock:
+            index = self._indexes.get(routes.hash)
+            if index is not None:
+                self._indexes.move_to_end(routes.hash)
+                return index
+        index = LexicalIndex(routes, self.ngram_range)
+        with self._lock:
+            self._indexes[routes.hash] = index
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+        return index
+
+    def match(self, query: str, routes) -> Optional[LocalMatch]:
+        scores = self.index(routes).scores(query)
+        if not scores:
+            return None
+        best = max(range(len(scores)), key=scores.__getitem__)
+        runner_up = max((s for i, s in enumerate(scores) if i != best), default=0.0)
+        score = scores[best]
+        margin = score - runner_up
+        confident = score >= self.min_score and margin >= self.margin
+        verify = False
+        with self._lock:
+            counts = self._counts
+            counts["queries"] += 1
+            if confident:
+                # Spread verified calls evenly instead of sampling at random.
+                self._confident += 1
+                n, rate = self._confident, self.verify_rate
+                verify = int(n * rate) > int((n - 1) * rate)
+                if not verify:
+                    counts["local_hits"] += 1
+        return LocalMatch(best, score, margin, confident, verify)
+
+    def record(self, match: LocalMatch, indices: Tuple[int, ...]):
+        # Compares a local match with the routes the API returned.
+        agreed = bool(indices) and indices[0] == match.index
+        with self._lock:
+            prefix = "verified" if match.confident else "ambiguous"
+            self._counts[prefix] += 1
+            if agreed:
+                self._counts[f"{prefix}_agreed"] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+            indexes = len(self._indexes)
+        queries = counts["queries"]
+        verified = counts["verified"]
+        ambiguous = counts["ambiguous"]
+        counts["local_hit_ratio"] = counts["local_hits"] / queries if queries else 0.0
+        counts["agreement_rate"] = (
+            counts["verified_agreed"] / verified if verified else None
+        )
+        counts["ambiguous_agreement_rate"] = (
+            counts["ambiguous_agreed"] / ambiguous if ambiguous else None
+        )
+        counts["indexes"] = indexes
+        return counts
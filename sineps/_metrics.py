@@ -0,0 +1,352 @@
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CIRCUIT_STATES = ("closed", "open", "half_open")
+
+
+class MetricsHook:
+    def request_finished(
+        self,
+        endpoint: str,
+        status_code: int,
+        latency: float,
+        request_bytes: int,
+        response_bytes: int,
+    ):
+        pass
+
+    def retry(self, endpoint: str, status_code: int, delay: float):
+        pass
+
+    def cache_lookup(self, endpoint: str, hit: bool):
+        pass
+
+    def local_route(self, endpoint: str, hit: bool):
+        pass
+
+    def hedge(self, endpoint: str, won: bool):
+        pass
+
+    def circuit_state(self, endpoint: str, state: str):
+        pass
+
+    def circuit_rejected(self, endpoint: str):
+        pass
+
+    def attach_pool(self, pool_stats: Callable[[], Dict]):
+        pass
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        # Linear interpolation inside the bucket, as Prometheus'
+        # histogram_quantile() does.
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        lower_bound, lower_count = 0.0, 0
+        for bound, count in self.cumulative():
+            if count >= rank:
+                if bound == float("inf"):
+                    return lower_bound
+                if count == lower_count:
+                    return bound
+                return lower_bound + (bound - lower_bound) * (
+                    (rank - lower_count) / (count - lower_count)
+                )
+            lower_bound, lower_count = bound, count
+        return lower_bound
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in self.cumulative()
+            },
+        }
+
+
+class _EndpointMetrics:
+    __slots__ = (
+        "latency",
+        "requests",
+        "request_bytes",
+        "response_bytes",
+        "statuses",
+        "retries",
+        "cache_hits",
+        "cache_misses",
+        "local_hits",
+        "local_misses",
+        "hedges",
+        "hedge_wins",
+        "circuit_state",
+        "circuit_rejected",
+    )
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.latency = _Histogram(buckets)
+        self.requests = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.statuses = {}
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.local_hits = 0
+        self.local_misses = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.circuit_state = "closed"
+        self.circuit_rejected = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "latency_seconds": self.latency.to_dict(),
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "local_hits": self.local_hits,
+            "local_misses": self.local_misses,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "circuit_state": self.circuit_state,
+            "circuit_rejected": self.circuit_rejected,
+        }
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_float(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metrics(MetricsHook):
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._pools = []
+
+    def _endpoint(self, endpoint: str) -> _EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = _EndpointMetrics(self.buckets)
+        return metrics
+
+    def request_finished(
+        self, endpoint, status_code, latency, request_bytes, response_bytes
+    ):
+        status = "error" if status_code is None else str(status_code)
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.requests += 1
+            metrics.latency.observe(latency)
+            metrics.request_bytes += request_bytes
+            metrics.response_bytes += response_bytes
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def retry(self, endpoint, status_code, delay):
+        with self._lock:
+            self._endpoint(endpoint).retries += 1
+
+    def cache_lookup(self, endpoint, hit):
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            if hit:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+
+    def local_route(self, endpoint, hit):
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            if hit:
+                metrics.local_hits += 1
+            else:
+                metrics.local_misses += 1
+
+    def hedge(self, endpoint, won):
+        with self._lock:
+            metrics = self._endpoint(endpoint)
+            metrics.hedges += 1
+            if won:
+                metrics.hedge_wins += 1
+
+    def circuit_state(self, endpoint, state):
+        with self._lock:
+            self._endpoint(endpoint).circuit_state = state
+
+    def circuit_rejected(self, endpoint):
+        with self._lock:
+            self._endpoint(endpoint).circuit_rejected += 1
+
+    def attach_pool(self, pool_stats):
+        try:
+            ref = weakref.WeakMethod(pool_stats)
+        except TypeError:
+            ref = lambda: pool_stats
+        with self._lock:
+            self._pools.append(ref)
+
+    def pool_stats(self) -> List[Dict]:
+        with self._lock:
+            self._pools = [ref for ref in self._pools if ref() is not None]
+            sources = [ref() for ref in self._pools]
+        return [source() for source in sources if source is not None]
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            endpoints = {
+                endpoint: metrics.to_dict()
+                for endpoint, metrics in self._endpoints.items()
+            }
+        return {"endpoints": endpoints, "pools": self.pool_stats()}
+
+    def to_prometheus(self, prefix: str = "sineps") -> str:
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = []
+
+            def family(name, kind, help_text):
+                lines.append(f"# HELP {prefix}_{name} {help_text}")
+                lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+            def sample(name, labels, value):
+                label_text = ",".join(
+                    f'{key}="{_escape_label(label)}"' for key, label in labels
+                )
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}")
+
+            family("request_duration_seconds", "histogram", "HTTP request latency.")
+            for endpoint, metrics in endpoints:
+                labels = [("endpoint", endpoint)]
+                for bound, count in metrics.latency.cumulative():
+                    sample(
+                        "request_duration_seconds_bucket",
+                        labels + [("le", _format_float(bound))],
+                        count,
+                    )
+                sample(
+                    "request_duration_seconds_sum",
+                    labels,
+                    _format_float(metrics.latency.sum),
+                )
+                sample("request_duration_seconds_count", labels, metrics.latency.count)
+
+            family("requests_total", "counter", "HTTP requests by status code.")
+            for endpoint, metrics in endpoints:
+                for status, count in sorted(metrics.statuses.items()):
+                    sample(
+                        "requests_total",
+                        [("endpoint", endpoint), ("status", status)],
+                        count,
+                    )
+
+            for name, attribute, help_text in (
+                ("request_bytes_total", "request_bytes", "Request body bytes sent."),
+                ("response_bytes_total", "response_bytes", "Response bytes read."),
+                ("retries_total", "retries", "Retried requests."),
+                ("hedges_total", "hedges", "Calls that sent a hedged request."),
+                ("hedge_wins_total", "hedge_wins", "Calls won by the hedged request."),
+                (
+                    "circuit_rejected_total",
+                    "circuit_rejected",
+                    "Calls rejected by an open circuit breaker.",
+                ),
+            ):
+                family(name, "counter", help_text)
+                for endpoint, metrics in endpoints:
+                    sample(name, [("endpoint", endpoint)], getattr(metrics, attribute))
+
+            family("circuit_state", "gauge", "Circuit breaker state (1 = current).")
+            for endpoint, metrics in endpoints:
+                for state in CIRCUIT_STATES:
+                    sample(
+                        "circuit_state",
+                        [("endpoint", endpoint), ("state", state)],
+                        int(metrics.circuit_state == state),
+                    )
+
+            family("cache_lookups_total", "counter", "Response cache lookups.")
+            for endpoint, metrics in endpoints:
+                for result, count in (
+                    ("hit", metrics.cache_hits),
+                    ("miss", metrics.cache_misses),
+                ):
+                    sample(
+                        "cache_lookups_total",
+                        [("endpoint", endpoint), ("result", result)],
+                        count,
+                    )
+
+            family("local_routes_total", "counter", "Local pre-router lookups.")
+            for endpoint, metrics in endpoints:
+                for result, count in (
+                    ("hit", metrics.local_hits),
+                    ("miss", metrics.local_misses),
+                ):
+                    sample(
+                        "local_routes_total",
+                        [("endpoint", endpoint), ("result", result)],
+                        count,
+                    )
+
+        pools = self.pool_stats()
+        gauges = sorted(
+            {
+                key
+                for stats in pools
+                for key, value in stats.items()
+                if isinstance(value, (int, float)) and not isinstance(value, bool)
+            }
+        )
+        for key in gauges:
+            name = key if key.startswith("pool_") else f"pool_{key}"
+            family(name, "gauge", f"Connection pool {key}.")
+            for index, stats in enumerate(pools):
+                if key in stats:
+                    sample(name, [("pool", index)], stats[key])
+        return "\n".join(lines) + "\n"
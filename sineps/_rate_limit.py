@@ -0,0 +1,71 @@
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int = 1):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._acquired = 0
+        self._throttled = 0
+        self._wait_time = 0.0
+
+    def _reserve(self, timeout: float = None):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            wait = 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.rate
+            if timeout is not None and wait > timeout:
+                return None
+            self._tokens -= 1.0
+            self._acquired += 1
+            if wait > 0:
+                self._throttled += 1
+                self._wait_time += wait
+            return wait
+
+    def _refund(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + 1.0)
+
+    def acquire(self, timeout: float = None) -> bool:
+        wait = self._reserve(timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    async def acquire_async(self, timeout: float = None) -> bool:
+        wait = self._reserve(timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            import asyncio
+
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self._refund()
+                raise
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "acquired": self._acquired,
+                "throttled": self._throttled,
+                "wait_time": self._wait_time,
+            }
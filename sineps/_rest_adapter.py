@@ -1,8 +1,6 @@
-import requests
-import aiohttp
-import requests.packages
-from typing import List, Dict
+from typing import List, Dict, Union
 import logging
+import time
 from json import JSONDecodeError
 
 from ._exceptions import (
@@ -12,17 +10,49 @@ from ._exceptions import (
     TooManyRequestsError,
     UnauthorizedAPIKeyError,
     PaymentRequiredError,
+    APITimeoutError,
+    CircuitOpenError,
+    TransportError,
+    TransportTimeoutError,
 )
 
 
 from ._utils import handle_error_message
+from ._retry import RetryPolicy
+from ._rate_limit import RateLimiter
+from ._codec import JSONCodec, get_codec
+from ._metrics import MetricsHook
+from ._timeout import Timeout, remaining
+from ._circuit_breaker import CircuitBreaker
+from ._transport import (
+    AiohttpTransport,
+    BaseTransport,
+    RequestsTransport,
+    get_transport,
+)
+
+
+LOG_LINE_PRE = "method=%s, url=%s, params=%s"
+LOG_LINE_POST = LOG_LINE_PRE + ", success=%s, status_code=%s, message=%s"
+RATE_LIMIT_TIMEOUT_MESSAGE = "Deadline exceeded while waiting for the rate limiter"
 
 
 class Response:
-    def __init__(self, status_code: int, message: str = "", data: List[Dict] = None):
+    __slots__ = ("status_code", "message", "data", "retries", "fallback")
+
+    def __init__(
+        self,
+        status_code: int,
+        message: str = "",
+        data: List[Dict] = None,
+        retries: int = 0,
+        fallback: bool = False,
+    ):
         self.status_code = int(status_code)
         self.message = str(message)
         self.data = data if data else []
+        self.retries = retries
+        self.fallback = fallback
 
 
 class BaseRestAdapter:
@@ -33,34 +63,139 @@ class BaseRestAdapter:
         ver: str = "v1",
         ssl_verify: bool = True,
         logger: logging.Logger = None,
+        retry: RetryPolicy = None,
+        rate_limiter: RateLimiter = None,
+        codec: JSONCodec = None,
+        metrics: MetricsHook = None,
+        base_url: str = None,
+        timeout: Timeout = None,
+        circuit_breaker: CircuitBreaker = None,
     ):
         self._logger = logger or logging.getLogger(__name__)
-        self.url = f"https://{hostname}/{ver}"
+        base_url = base_url.rstrip("/") if base_url else f"https://{hostname}"
+        self.url = f"{base_url}/{ver}"
         self._api_key = api_key
         self._ssl_verify = ssl_verify
+        self._retry = retry
+        self._rate_limiter = rate_limiter
+        self._codec = get_codec(codec if codec is not None else "auto")
+        self._metrics = metrics
+        self._timeout = timeout or Timeout()
+        self._circuit_breaker = circuit_breaker
+        self._transport = None
+        self._closed = False
+
+    def _use_transport(self, transport: BaseTransport):
+        transport.configure(
+            {"Content-Type": "application/json", "api-key": self._api_key},
+            self._ssl_verify,
+        )
+        self._transport = transport
+
+    def pool_stats(self) -> Dict:
+        return self._transport.stats()
 
     def _define_exception_class(self, exception_class, base_exception_class):
         if exception_class:
             return exception_class
         return base_exception_class
 
-    def _build_log_lines(self, http_method: str, endpoint: str, ep_params: Dict):
-        full_url = self.url + endpoint
-        log_line_pre = f"method={http_method}, url={full_url}, params={ep_params}"
-        log_line_post = ", ".join(
-            (log_line_pre, "success={}, status_code={}, message={}")
+    def _record_request(self):
+        if self._retry is not None:
+            self._retry.record_request()
+
+    def _get_retry_delay(
+        self, endpoint, retries, status_code=None, retry_after=None, expires_at=None
+    ):
+        if self._retry is None:
+            return None
+        delay = self._retry.get_delay(retries, status_code, retry_after)
+        if delay is not None and expires_at is not None:
+            # No point in sleeping if the next attempt could not finish in time.
+            if delay >= remaining(expires_at):
+                return None
+        if delay is not None:
+            self._logger.debug(
+                "retry=%d, status_code=%s, delay=%.3f", retries + 1, status_code, delay
+            )
+            if self._metrics is not None:
+                self._metrics.retry(endpoint, status_code, delay)
+        return delay
+
+    def _record_attempt(self, endpoint, status_code, start, body, response_bytes):
+        latency = time.perf_counter() - start
+        if self._metrics is not None:
+            self._metrics.request_finished(
+                endpoint,
+                status_code,
+                latency,
+                len(body) if body else 0,
+                response_bytes,
+            )
+        if self._circuit_breaker is not None:
+            state = self._circuit_breaker.record(endpoint, status_code, latency)
+            if state is not None:
+                self._circuit_state_changed(endpoint, state)
+
+    def _circuit_state_changed(self, endpoint, state):
+        self._logger.warning("circuit for %s is %s", endpoint, state)
+        if self._metrics is not None:
+            self._metrics.circuit_state(endpoint, state)
+
+    def _acquire_circuit(self, endpoint):
+        if self._circuit_breaker is None:
+            return
+        try:
+            state = self._circuit_breaker.acquire(endpoint)
+        except CircuitOpenError:
+            if self._metrics is not None:
+                self._metrics.circuit_rejected(endpoint)
+            raise
+        if state is not None:
+            self._circuit_state_changed(endpoint, state)
+
+    def _release_circuit(self, endpoint):
+        if self._circuit_breaker is not None:
+            self._circuit_breaker.release(endpoint)
+
+    def _circuit_fallback(self, endpoint, body, error, retries):
+        fallback = self._circuit_breaker.fallback
+        data = None
+        if fallback is not None:
+            request = self._codec.loads(body) if body else None
+            data = fallback(endpoint, request, error)
+        if data is None:
+            raise error
+        return Response(
+            200, message="Success", data=data, retries=retries, fallback=True
         )
-        return full_url, log_line_pre, log_line_post
+
+    def _check_deadline(self, expires_at, retries):
+        if expires_at is not None and remaining(expires_at) <= 0:
+            raise APITimeoutError(f"Deadline exceeded after {retries} retries")
+
+    def _attempt_timeout(self, expires_at, retries):
+        # Checked again here because the rate limiter wait may have used it up.
+        time_left = remaining(expires_at)
+        if time_left is not None and time_left <= 0:
+            raise APITimeoutError(f"Deadline exceeded after {retries} retries")
+        return self._timeout.clip(time_left)
+
+    def _raise_transport_error(self, e):
+        if isinstance(e, TransportTimeoutError):
+            raise APITimeoutError("Request timed out") from e
+        raise self._exception_class("Request failed") from e
+
+    def _encode_body(self, data):
+        if data is None or isinstance(data, bytes):
+            return data
+        return self._codec.dumps(data)
 
     def _log_and_raise_exception(
-        self, log_line_post, success, status_code, message, exception
+        self, log_args, success, status_code, message, exception
     ):
-        log_line = log_line_post.format(success, status_code, message)
-        if success:
-            self._logger.debug(msg=log_line)
-        else:
-            self._logger.debug(msg=log_line)
-
+        self._logger.debug(LOG_LINE_POST, *log_args, success, status_code, message)
+        if not success:
             if status_code == 400:
                 raise BadRequestError(
                     f"{status_code} - {message}",
@@ -96,140 +231,356 @@ class BaseRestAdapter:
 
 class RestAdapter(BaseRestAdapter):
     def __init__(
-        self, hostname, api_key, ver, ssl_verify, logger, exception_class=None
+        self,
+        hostname,
+        api_key,
+        ver,
+        ssl_verify,
+        logger,
+        exception_class=None,
+        retry: RetryPolicy = None,
+        rate_limiter: RateLimiter = None,
+        codec: JSONCodec = None,
+        metrics: MetricsHook = None,
+        base_url: str = None,
+        timeout: Timeout = None,
+        circuit_breaker: CircuitBreaker = None,
+        transport: Union[str, BaseTransport] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        pool_idle_timeout: float = None,
     ):
-        super().__init__(hostname, api_key, ver, ssl_verify, logger)
+        super().__init__(
+            hostname,
+            api_key,
+            ver,
+            ssl_verify,
+            logger,
+            retry=retry,
+            rate_limiter=rate_limiter,
+            codec=codec,
+            metrics=metrics,
+            base_url=base_url,
+            timeout=timeout,
+            circuit_breaker=circuit_breaker,
+        )
         self._exception_class = self._define_exception_class(
             exception_class, RestAdapterError
         )
+        if transport is None:
+            transport = RequestsTransport(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                pool_idle_timeout=pool_idle_timeout,
+            )
+        self._use_transport(get_transport(transport))
+
+    def close(self):
+        self._closed = True
+        self._transport.close()
 
     def _do(
-        self, http_method: str, endpoint: str, ep_params: Dict = None, data: Dict = None
+        self,
+        http_method: str,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Union[Dict, bytes] = None,
+        expires_at: float = None,
     ):
-        full_url, log_line_pre, log_line_post = self._build_log_lines(
-            http_method, endpoint, ep_params
-        )
-        headers = {
-            "Content-Type": "application/json",
-            "api-key": self._api_key,
-        }
+        full_url = self.url + endpoint
+        log_args = (http_method, full_url, ep_params)
 
-        try:
-            self._logger.debug(msg=log_line_pre)
-            response = requests.request(
-                method=http_method,
-                url=full_url,
-                verify=self._ssl_verify,
-                headers=headers,
-                params=ep_params,
-                json=data,
+        body = self._encode_body(data)
+        self._record_request()
+        retries = 0
+        while True:
+            if self._closed:
+                raise self._exception_class("Client is closed")
+            self._check_deadline(expires_at, retries)
+            try:
+                self._acquire_circuit(endpoint)
+            except CircuitOpenError as e:
+                return self._circuit_fallback(endpoint, body, e, retries)
+            try:
+                if self._rate_limiter is not None:
+                    if not self._rate_limiter.acquire(timeout=remaining(expires_at)):
+                        raise APITimeoutError(RATE_LIMIT_TIMEOUT_MESSAGE)
+                timeout = self._attempt_timeout(expires_at, retries)
+                start = time.perf_counter()
+                self._logger.debug(LOG_LINE_PRE, *log_args)
+                response = self._transport.request(
+                    http_method,
+                    full_url,
+                    params=ep_params,
+                    body=body,
+                    timeout=timeout,
+                )
+            except TransportError as e:
+                self._logger.error("%s", e)
+                self._record_attempt(endpoint, None, start, body, 0)
+                delay = self._get_retry_delay(endpoint, retries, expires_at=expires_at)
+                if delay is None:
+                    self._raise_transport_error(e)
+                time.sleep(delay)
+                retries += 1
+                continue
+            except BaseException:
+                self._release_circuit(endpoint)
+                raise
+
+            self._record_attempt(
+                endpoint, response.status_code, start, body, len(response.content)
+            )
+            delay = self._get_retry_delay(
+                endpoint,
+                retries,
+                response.status_code,
+                response.headers.get("Retry-After"),
+                expires_at,
             )
-        except requests.exceptions.RequestException as e:
-            self._logger.error(msg=(str(e)))
-            raise self._exception_class("Request failed") from e
+            if delay is None:
+                break
+            time.sleep(delay)
+            retries += 1
 
         try:
-            data_out = response.json()
+            data_out = self._codec.loads(response.content)
         except (ValueError, JSONDecodeError) as e:
-            self._logger.error(msg=log_line_post.format(False, None, e))
+            self._logger.error(LOG_LINE_POST, *log_args, False, None, e)
             raise self._exception_class(f"{response.status_code}") from e
 
         is_success = 299 >= response.status_code >= 200
         message = handle_error_message(is_success, data_out)
         self._log_and_raise_exception(
-            log_line_post,
+            log_args,
             is_success,
             response.status_code,
             message,
             self._exception_class,
         )
 
-        return Response(response.status_code, message=message, data=data_out)
+        return Response(
+            response.status_code, message=message, data=data_out, retries=retries
+        )
 
-    def get(self, endpoint: str, ep_params: Dict = None) -> Response:
-        return self._do(http_method="GET", endpoint=endpoint, ep_params=ep_params)
+    def get(
+        self, endpoint: str, ep_params: Dict = None, expires_at: float = None
+    ) -> Response:
+        return self._do(
+            http_method="GET",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            expires_at=expires_at,
+        )
 
     def post(
-        self, endpoint: str, ep_params: Dict = None, data: Dict = None
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Union[Dict, bytes] = None,
+        expires_at: float = None,
     ) -> Response:
         return self._do(
-            http_method="POST", endpoint=endpoint, ep_params=ep_params, data=data
+            http_method="POST",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            data=data,
+            expires_at=expires_at,
         )
 
     def delete(
-        self, endpoint: str, ep_params: Dict = None, data: Dict = None
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Union[Dict, bytes] = None,
+        expires_at: float = None,
     ) -> Response:
         return self._do(
-            http_method="DELETE", endpoint=endpoint, ep_params=ep_params, data=data
+            http_method="DELETE",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            data=data,
+            expires_at=expires_at,
         )
 
 
 class AsyncRestAdapter(BaseRestAdapter):
 
     def __init__(
-        self, hostname, api_key, ver, ssl_verify, logger, exception_class=None
+        self,
+        hostname,
+        api_key,
+        ver,
+        ssl_verify,
+        logger,
+        exception_class=None,
+        retry: RetryPolicy = None,
+        rate_limiter: RateLimiter = None,
+        codec: JSONCodec = None,
+        metrics: MetricsHook = None,
+        base_url: str = None,
+        timeout: Timeout = None,
+        circuit_breaker: CircuitBreaker = None,
+        transport: Union[str, BaseTransport] = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: int = 10,
     ):
-        super().__init__(hostname, api_key, ver, ssl_verify, logger)
+        super().__init__(
+            hostname,
+            api_key,
+            ver,
+            ssl_verify,
+            logger,
+            retry=retry,
+            rate_limiter=rate_limiter,
+            codec=codec,
+            metrics=metrics,
+            base_url=base_url,
+            timeout=timeout,
+            circuit_breaker=circuit_breaker,
+        )
+        import asyncio
+
+        self._asyncio = asyncio
         self._exception_class = self._define_exception_class(
             exception_class, RestAdapterError
         )
+        if transport is None:
+            transport = AiohttpTransport(
+                limit=limit,
+                limit_per_host=limit_per_host,
+                keepalive_timeout=keepalive_timeout,
+                ttl_dns_cache=ttl_dns_cache,
+            )
+        self._use_transport(get_transport(transport, asynchronous=True))
+
+    async def aclose(self):
+        self._closed = True
+        await self._transport.aclose()
 
     async def _do(
-        self, http_method: str, endpoint: str, ep_params: Dict = None, data: Dict = None
+        self,
+        http_method: str,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Union[Dict, bytes] = None,
+        expires_at: float = None,
     ):
-        full_url, log_line_pre, log_line_post = self._build_log_lines(
-            http_method, endpoint, ep_params
-        )
-        headers = {
-            "Content-Type": "application/json",
-            "api-key": self._api_key,
-        }
+        full_url = self.url + endpoint
+        log_args = (http_method, full_url, ep_params)
 
-        try:
-            self._logger.debug(msg=log_line_pre)
-            async with aiohttp.ClientSession() as session:
-                async with session.request(
-                    method=http_method,
-                    url=full_url,
-                    ssl=self._ssl_verify,
-                    headers=headers,
-                    params=ep_params,
-                    json=data,
-                ) as response:
-                    try:
-                        data_out = await response.json()
-                    except (ValueError, JSONDecodeError) as e:
-                        self._logger.error(msg=log_line_post.format(False, None, e))
-                        raise self._exception_class(f"{response.status_code}") from e
-
-                    is_success = 299 >= response.status >= 200
-                    message = handle_error_message(is_success, data_out)
-                    self._log_and_raise_exception(
-                        log_line_post,
-                        is_success,
-                        response.status,
-                        message,
-                        self._exception_class(f"{response.status} - {message}"),
+        body = self._encode_body(data)
+        self._record_request()
+        retries = 0
+        while True:
+            if self._closed:
+                raise self._exception_class("Client is closed")
+            self._check_deadline(expires_at, retries)
+            try:
+                self._acquire_circuit(endpoint)
+            except CircuitOpenError as e:
+                return self._circuit_fallback(endpoint, body, e, retries)
+            try:
+                if self._rate_limiter is not None:
+                    acquired = await self._rate_limiter.acquire_async(
+                        timeout=remaining(expires_at)
                     )
+                    if not acquired:
+                        raise APITimeoutError(RATE_LIMIT_TIMEOUT_MESSAGE)
+                timeout = self._attempt_timeout(expires_at, retries)
+                start = time.perf_counter()
+                self._logger.debug(LOG_LINE_PRE, *log_args)
+                response = await self._transport.request(
+                    http_method,
+                    full_url,
+                    params=ep_params,
+                    body=body,
+                    timeout=timeout,
+                )
+            except TransportError as e:
+                self._logger.error("%s", e)
+                self._record_attempt(endpoint, None, start, body, 0)
+                delay = self._get_retry_delay(endpoint, retries, expires_at=expires_at)
+                if delay is None:
+                    self._raise_transport_error(e)
+            except BaseException:
+                self._release_circuit(endpoint)
+                raise
+            else:
+                status_code = response.status_code
+                self._record_attempt(
+                    endpoint, status_code, start, body, len(response.content)
+                )
+                delay = self._get_retry_delay(
+                    endpoint,
+                    retries,
+                    status_code,
+                    response.headers.get("Retry-After"),
+                    expires_at,
+                )
+                if delay is None:
+                    break
+            await self._asyncio.sleep(delay)
+            retries += 1
+
+        try:
+            data_out = self._codec.loads(response.content)
+        except (ValueError, JSONDecodeError) as e:
+            self._logger.error(LOG_LINE_POST, *log_args, False, None, e)
+            raise self._exception_class(f"{status_code}") from e
+
+        is_success = 299 >= status_code >= 200
+        message = handle_error_message(is_success, data_out)
+        self._log_and_raise_exception(
+            log_args,
+            is_success,
+            status_code,
+            message,
+            self._exception_class(f"{status_code} - {message}"),
+        )
 
-                    return Response(response.status, message=message, data=data_out)
-        except aiohttp.ClientError as e:
-            self._logger.error(msg=(str(e)))
-            raise self._exception_class("Request failed") from e
+        return Response(status_code, message=message, data=data_out, retries=retries)
 
-    async def get(self, endpoint: str, ep_params: Dict = None) -> Response:
-        return await self._do(http_method="GET", endpoint=endpoint, ep_params=ep_params)
+    async def get(
+        self, endpoint: str, ep_params: Dict = None, expires_at: float = None
+    ) -> Response:
+        return await self._do(
+            http_method="GET",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            expires_at=expires_at,
+        )
 
     async def post(
-        self, endpoint: str, ep_params: Dict = None, data: Dict = None
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Union[Dict, bytes] = None,
+        expires_at: float = None,
     ) -> Response:
         return await self._do(
-            http_method="POST", endpoint=endpoint, ep_params=ep_params, data=data
+            http_method="POST",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            data=data,
+            expires_at=expires_at,
         )
 
     async def delete(
-        self, endpoint: str, ep_params: Dict = None, data: Dict = None
+        self,
+        endpoint: str,
+        ep_params: Dict = None,
+        data: Union[Dict, bytes] = None,
+        expires_at: float = None,
     ) -> Response:
         return await self._do(
-            http_method="DELETE", endpoint=endpoint, ep_params=ep_params, data=data
+            http_method="DELETE",
+            endpoint=endpoint,
+            ep_params=ep_params,
+            data=data,
+            expires_at=expires_at,
         )
@@ -0,0 +1,113 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+
+class RetryBudget:
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_retries_per_second: float = 1.0,
+        max_tokens: float = 20.0,
+    ):
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._rejected = 0
+
+    def _refill(self, now):
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(
+            self.max_tokens, self._tokens + elapsed * self.min_retries_per_second
+        )
+
+    def record_request(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < 1.0:
+                self._rejected += 1
+                return False
+            self._tokens -= 1.0
+            return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {"tokens": self._tokens, "rejected": self._rejected}
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        retry_statuses=(429, 500, 502, 503, 504),
+        retry_connection_errors: bool = True,
+        respect_retry_after: bool = True,
+        budget: RetryBudget = None,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_connection_errors = retry_connection_errors
+        self.respect_retry_after = respect_retry_after
+        self.budget = budget if budget is not None else RetryBudget()
+
+    def record_request(self):
+        self.budget.record_request()
+
+    def backoff(self, retries: int) -> float:
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff_base * (2**retries))
+        )
+
+    def get_delay(self, retries: int, status_code: int = None, retry_after=None):
+        if retries + 1 >= self.max_attempts:
+            return None
+        if status_code is None:
+            if not self.retry_connection_errors:
+                return None
+        elif status_code not in self.retry_statuses:
+            return None
+
+        delay = self.backoff(retries)
+        if self.respect_retry_after and retry_after is not None:
+            retry_after = parse_retry_after(retry_after)
+            if retry_after is not None:
+                if retry_after > self.backoff_max:
+                    return None
+                delay = max(delay, retry_after)
+
+        if not self.budget.try_acquire():
+            return None
+        return delay
+
+
+def parse_retry_after(value) -> float:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
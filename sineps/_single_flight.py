@@ -0,0 +1,125 @@
+import threading
+
+from ._exceptions import APITimeoutError
+from ._timeout import remaining
+
+DEADLINE_MESSAGE = "Deadline exceeded while waiting for a coalesced request"
+
+
+def _outlives(expires_at: float, leader_expires_at: float) -> bool:
+    # A follower that would still have time left when the leader's deadline ran out.
+    if leader_expires_at is None:
+        return False
+    return expires_at is None or expires_at > leader_expires_at
+
+
+def _wait_timeout(expires_at: float) -> float:
+    time_left = remaining(expires_at)
+    if time_left is not None and time_left <= 0:
+        raise APITimeoutError(DEADLINE_MESSAGE)
+    return time_left
+
+
+class _Call:
+    def __init__(self, expires_at: float = None):
+        self.event = threading.Event()
+        self.expires_at = expires_at
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key, fn, expires_at: float = None):
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = _Call(expires_at)
+                    self._executions += 1
+                    break
+                self._coalesced += 1
+
+            if not call.event.wait(_wait_timeout(expires_at)):
+                raise APITimeoutError(DEADLINE_MESSAGE)
+            if call.error is None:
+                return call.result
+            if not (
+                isinstance(call.error, APITimeoutError)
+                and _outlives(expires_at, call.expires_at)
+            ):
+                raise call.error
+            # The leader ran out of its own, shorter deadline: try again.
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+class AsyncSingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    async def do(self, key, fn, expires_at: float = None):
+        import asyncio
+
+        call_key = (asyncio.get_running_loop(), key)
+        while True:
+            with self._lock:
+                call = self._calls.get(call_key)
+                if call is None or call[0].done():
+                    task = asyncio.ensure_future(fn())
+                    call = self._calls[call_key] = (task, expires_at)
+                    task.add_done_callback(lambda t: self._done(call_key, t))
+                    self._executions += 1
+                else:
+                    self._coalesced += 1
+            task, leader_expires_at = call
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(task), _wait_timeout(expires_at)
+                )
+            except asyncio.TimeoutError:
+                raise APITimeoutError(DEADLINE_MESSAGE) from None
+            except APITimeoutError:
+                if not _outlives(expires_at, leader_expires_at):
+                    raise
+                # The first caller ran out of its own, shorter deadline: try again.
+
+    def _done(self, call_key, task):
+        with self._lock:
+            if self._calls.get(call_key, (None,))[0] is task:
+                del self._calls[call_key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+            }
@@ -0,0 +1,67 @@
+import time
+from typing import Tuple, Union
+
+
+def _min(a: float, b: float) -> float:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+class Timeout:
+    __slots__ = ("total", "connect", "read")
+
+    def __init__(self, total: float = None, connect: float = None, read: float = None):
+        for name, value in (("total", total), ("connect", connect), ("read", read)):
+            if value is not None and value <= 0:
+                raise ValueError(f"{name} timeout must be positive")
+        self.total = total
+        self.connect = connect
+        self.read = read
+
+    def clip(self, remaining: float) -> "Timeout":
+        if remaining is None:
+            return self
+        return Timeout(
+            total=_min(self.total, remaining),
+            connect=_min(self.connect, remaining),
+            read=_min(self.read, remaining),
+        )
+
+    def connect_read(self) -> Tuple[float, float]:
+        # For libraries without a total timeout, cap each phase by it instead.
+        return _min(self.connect, self.total), _min(self.read, self.total)
+
+    def __repr__(self):
+        return (
+            f"Timeout(total={self.total!r}, connect={self.connect!r}, "
+            f"read={self.read!r})"
+        )
+
+
+DEFAULT_TIMEOUT = Timeout(connect=10.0, read=60.0)
+
+
+def get_timeout(timeout: Union[float, Timeout, None]) -> Timeout:
+    if timeout is None:
+        return Timeout()
+    if isinstance(timeout, Timeout):
+        return timeout
+    timeout = float(timeout)
+    return Timeout(total=timeout, connect=timeout, read=timeout)
+
+
+def deadline_at(deadline: float) -> float:
+    if deadline is None:
+        return None
+    if deadline <= 0:
+        raise ValueError("deadline must be positive")
+    return time.monotonic() + deadline
+
+
+def remaining(expires_at: float) -> float:
+    if expires_at is None:
+        return None
+    return expires_at - time.monotonic()
@@ -0,0 +1,564 @@
+import threading
+import time
+from typing import Dict, Mapping, Union
+
+from ._exceptions import TransportError, TransportTimeoutError
+from ._timeout import Timeout
+
+
+class TransportResponse:
+    __slots__ = ("status_code", "headers", "content")
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+
+class BaseTransport:
+    name = None
+
+    def __init__(self):
+        self._headers = None
+        self._ssl_verify = True
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._requests = 0
+        self._closed = False
+
+    def configure(self, headers: Dict[str, str], ssl_verify: bool = True):
+        if self._headers is not None:
+            raise ValueError("A transport can only be used by one client")
+        self._headers = dict(headers)
+        self._ssl_verify = ssl_verify
+
+    def _end(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "transport": self.name,
+                "requests": self._requests,
+                "in_flight": self._in_flight,
+                "closed": self._closed,
+            }
+
+
+class Transport(BaseTransport):
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Dict = None,
+        body: bytes = None,
+        timeout: Timeout = None,
+    ) -> TransportResponse:
+        raise NotImplementedError
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+
+
+class AsyncTransport(BaseTransport):
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Dict = None,
+        body: bytes = None,
+        timeout: Timeout = None,
+    ) -> TransportResponse:
+        raise NotImplementedError
+
+    async def aclose(self):
+        with self._lock:
+            self._closed = True
+
+
+class RequestsTransport(Transport):
+    name = "requests"
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        pool_idle_timeout: float = None,
+    ):
+        super().__init__()
+        import requests
+        import requests.adapters
+
+        self._requests_module = requests
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._pool_block = pool_block
+        self._pool_idle_timeout = pool_idle_timeout
+        self._session = None
+        self._http_adapter = None
+        self._last_used = None
+        self._idle_evictions = 0
+        # urllib3 waits forever for a free connection when the pool blocks,
+        # so bound the wait here with the connect timeout.
+        self._slots = threading.BoundedSemaphore(pool_maxsize) if pool_block else None
+
+    def _create_session(self):
+        requests = self._requests_module
+        session = requests.Session()
+        self._http_adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self._pool_connections,
+            pool_maxsize=self._pool_maxsize,
+            pool_block=self._pool_block,
+        )
+        session.mount("https://", self._http_adapter)
+        session.mount("http://", self._http_adapter)
+        session.verify = self._ssl_verify
+        session.headers.update(self._headers or {})
+        return session
+
+    def _acquire_session(self):
+        with self._lock:
+            if self._closed:
+                raise TransportError("Transport is closed")
+            now = time.monotonic()
+            if (
+                self._session is not None
+                and self._pool_idle_timeout is not None
+                and self._in_flight == 0
+                and now - self._last_used > self._pool_idle_timeout
+            ):
+                self._session.close()
+                self._session = None
+                self._idle_evictions += 1
+            if self._session is None:
+                self._session = self._create_session()
+            self._last_used = now
+            self._in_flight += 1
+            return self._session
+
+    def _release_session(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._last_used = time.monotonic()
+
+    def request(self, method, url, params=None, body=None, timeout=None):
+        connect, read = timeout.connect_read() if timeout else (None, None)
+        if self._slots is not None and not self._slots.acquire(timeout=connect):
+            raise TransportTimeoutError("Timed out waiting for a free connection")
+        try:
+            session = self._acquire_session()
+            try:
+                response = session.request(
+                    method=method,
+                    url=url,
+                    params=params,
+                    data=body,
+                    timeout=(connect, read),
+                )
+            except self._requests_module.exceptions.Timeout as e:
+                raise TransportTimeoutError(str(e)) from e
+            except self._requests_module.exceptions.RequestException as e:
+                raise TransportError(str(e)) from e
+            finally:
+                self._release_session()
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+        return TransportResponse(
+            response.status_code, response.headers, response.content
+        )
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                "transport": self.name,
+                "pool_connections": self._pool_connections,
+                "pool_maxsize": self._pool_maxsize,
+                "hosts": 0,
+                "connections_created": 0,
+                "idle_connections": 0,
+                "requests": 0,
+                "in_flight": self._in_flight,
+                "idle_evictions": self._idle_evictions,
+                "closed": self._closed,
+            }
+            if self._session is None:
+                return stats
+            pools = self._http_adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                stats["hosts"] += 1
+                stats["connections_created"] += pool.num_connections
+                stats["requests"] += pool.num_requests
+                if pool.pool is not None:
+                    stats["idle_connections"] += sum(
+                        1 for conn in list(pool.pool.queue) if conn is not None
+                    )
+            return stats
+
+
+class _PerLoopTransport(AsyncTransport):
+    # aiohttp sessions and httpx async clients are bound to the event loop
+    # they were created on, so keep one per running loop.
+
+    def __init__(self):
+        super().__init__()
+        import asyncio
+
+        self._asyncio = asyncio
+        self._sessions = {}
+        self._guards = {}
+
+    def _create_session(self):
+        raise NotImplementedError
+
+    def _is_closed(self, session) -> bool:
+        raise NotImplementedError
+
+    async def _close_session(self, session):
+        raise NotImplementedError
+
+    async def _session_guard(self, loop, session):
+        # A suspended async generator is finalized by loop.shutdown_asyncgens()
+        # (which asyncio.run() calls) while the loop can still close sockets.
+        try:
+            yield
+        finally:
+            if not loop.is_closed() and not self._is_closed(session):
+                await self._close_session(session)
+
+    def _guard_session(self, loop, session):
+        guard = self._session_guard(loop, session)
+        try:
+            guard.asend(None).send(None)
+        except StopIteration:
+            pass
+        return guard
+
+    @staticmethod
+    def _finish_guard(guard):
+        # The loop is gone, so just end the generator without awaiting anything.
+        try:
+            guard.aclose().send(None)
+        except (StopIteration, RuntimeError):
+            pass
+
+    def _get_session(self):
+        loop = self._asyncio.get_running_loop()
+        with self._lock:
+            if self._closed:
+                raise TransportError("Transport is closed")
+            for other_loop in [l for l in self._sessions if l.is_closed()]:
+                del self._sessions[other_loop]
+                self._finish_guard(self._guards.pop(other_loop))
+            session = self._sessions.get(loop)
+            if session is None or self._is_closed(session):
+                session = self._create_session()
+                self._sessions[loop] = session
+                guard = self._guards.pop(loop, None)
+                if guard is not None:
+                    self._finish_guard(guard)
+                self._guards[loop] = self._guard_session(loop, session)
+            self._in_flight += 1
+            self._requests += 1
+            return session
+
+    async def aclose(self):
+        loop = self._asyncio.get_running_loop()
+        with self._lock:
+            self._closed = True
+            self._sessions = {}
+            guards = self._guards
+            self._guards = {}
+        for session_loop, guard in guards.items():
+            if session_loop is loop:
+                await guard.aclose()
+            elif session_loop.is_closed():
+                self._finish_guard(guard)
+            elif session_loop.is_running():
+                self._asyncio.run_coroutine_threadsafe(guard.aclose(), session_loop)
+            else:
+                # Kept alive so the loop closes the session when it shuts down.
+                self._guards[session_loop] = guard
+
+    def _open_sessions(self) -> list:
+        return [s for s in self._sessions.values() if not self._is_closed(s)]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "transport": self.name,
+                "sessions": len(self._open_sessions()),
+                "requests": self._requests,
+                "in_flight": self._in_flight,
+                "closed": self._closed,
+            }
+
+
+class AiohttpTransport(_PerLoopTransport):
+    name = "aiohttp"
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        ttl_dns_cache: int = 10,
+    ):
+        super().__init__()
+        import aiohttp
+
+        self._aiohttp = aiohttp
+        self._limit = limit
+        self._limit_per_host = limit_per_host
+        self._keepalive_timeout = keepalive_timeout
+        self._ttl_dns_cache = ttl_dns_cache
+
+    def _create_session(self):
+        connector = self._aiohttp.TCPConnector(
+            limit=self._limit,
+            limit_per_host=self._limit_per_host,
+            keepalive_timeout=self._keepalive_timeout,
+            ttl_dns_cache=self._ttl_dns_cache,
+            use_dns_cache=self._ttl_dns_cache != 0,
+        )
+        return self._aiohttp.ClientSession(
+            connector=connector, headers=self._headers or {}
+        )
+
+    def _is_closed(self, session):
+        return session.closed
+
+    async def _close_session(self, session):
+        await session.close()
+
+    async def request(self, method, url, params=None, body=None, timeout=None):
+        timeout = timeout or Timeout()
+        session = self._get_session()
+        try:
+            async with session.request(
+                method=method,
+                url=url,
+                ssl=self._ssl_verify,
+                params=params,
+                data=body,
+                # aiohttp's connect timeout includes waiting for a free connection.
+                timeout=self._aiohttp.ClientTimeout(
+                    total=timeout.total, connect=timeout.connect, sock_read=timeout.read
+                ),
+            ) as response:
+                content = await response.read()
+                return TransportResponse(response.status, response.headers, content)
+        except self._asyncio.TimeoutError as e:
+            raise TransportTimeoutError("Request timed out") from e
+        except self._aiohttp.ClientError as e:
+            raise TransportError(str(e)) from e
+        finally:
+            self._end()
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats.update({"limit": self._limit, "limit_per_host": self._limit_per_host})
+        return stats
+
+
+def _httpx_pool_stats(clients) -> Dict:
+    # httpx does not expose its connection pool; read it defensively.
+    stats = {"connections": 0, "http2_connections": 0, "idle_connections": 0}
+    for client in clients:
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        for connection in list(getattr(pool, "connections", ())):
+            stats["connections"] += 1
+            if "HTTP/2" in connection.info():
+                stats["http2_connections"] += 1
+            if connection.is_idle():
+                stats["idle_connections"] += 1
+    return stats
+
+
+class _HTTPXOptions:
+    def _init_httpx(
+        self,
+        http2,
+        http1,
+        max_connections,
+        max_keepalive_connections,
+        keepalive_expiry,
+    ):
+        import httpx
+
+        if http2:
+            # Fail here rather than on the first request when h2 is missing.
+            import h2  # noqa: F401
+
+        self._httpx = httpx
+        self._http1 = http1
+        self._http2 = http2
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+
+    def _timeout(self, timeout):
+        connect, read = timeout.connect_read() if timeout else (None, None)
+        return self._httpx.Timeout(connect=connect, read=read, write=read, pool=connect)
+
+    def _client_options(self) -> Dict:
+        return {
+            "http1": self._http1,
+            "http2": self._http2,
+            "limits": self._limits,
+            "verify": self._ssl_verify,
+            "headers": self._headers or {},
+            "timeout": None,
+        }
+
+
+class HTTPXTransport(_HTTPXOptions, Transport):
+    name = "httpx"
+
+    def __init__(
+        self,
+        http2: bool = True,
+        http1: bool = True,
+        max_connections: int = 10,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 5.0,
+    ):
+        super().__init__()
+        self._init_httpx(
+            http2, http1, max_connections, max_keepalive_connections, keepalive_expiry
+        )
+        self._client = None
+
+    def _get_client(self):
+        with self._lock:
+            if self._closed:
+                raise TransportError("Transport is closed")
+            if self._client is None:
+                self._client = self._httpx.Client(**self._client_options())
+            self._in_flight += 1
+            self._requests += 1
+            return self._client
+
+    def request(self, method, url, params=None, body=None, timeout=None):
+        client = self._get_client()
+        try:
+            response = client.request(
+                method,
+                url,
+                params=params,
+                content=body,
+                timeout=self._timeout(timeout),
+            )
+        except self._httpx.TimeoutException as e:
+            raise TransportTimeoutError(str(e)) from e
+        except self._httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        finally:
+            self._end()
+        return TransportResponse(
+            response.status_code, response.headers, response.content
+        )
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["http2"] = self._http2
+        stats.update(_httpx_pool_stats([self._client] if self._client else []))
+        return stats
+
+
+class AsyncHTTPXTransport(_HTTPXOptions, _PerLoopTransport):
+    name = "httpx"
+
+    def __init__(
+        self,
+        http2: bool = True,
+        http1: bool = True,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+    ):
+        super().__init__()
+        self._init_httpx(
+            http2, http1, max_connections, max_keepalive_connections, keepalive_expiry
+        )
+
+    def _create_session(self):
+        return self._httpx.AsyncClient(**self._client_options())
+
+    def _is_closed(self, session):
+        return session.is_closed
+
+    async def _close_session(self, session):
+        await session.aclose()
+
+    async def request(self, method, url, params=None, body=None, timeout=None):
+        client = self._get_session()
+        try:
+            response = await self._asyncio.wait_for(
+                client.request(
+                    method,
+                    url,
+                    params=params,
+                    content=body,
+                    timeout=self._timeout(timeout),
+                ),
+                timeout.total if timeout else None,
+            )
+        except (self._httpx.TimeoutException, self._asyncio.TimeoutError) as e:
+            raise TransportTimeoutError(str(e) or "Request timed out") from e
+        except self._httpx.HTTPError as e:
+            raise TransportError(str(e)) from e
+        finally:
+            self._end()
+        return TransportResponse(
+            response.status_code, response.headers, response.content
+        )
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats["http2"] = self._http2
+        with self._lock:
+            sessions = self._open_sessions()
+        stats.update(_httpx_pool_stats(sessions))
+        return stats
+
+
+TRANSPORTS = {"requests": RequestsTransport, "httpx": HTTPXTransport}
+ASYNC_TRANSPORTS = {"aiohttp": AiohttpTransport, "httpx": AsyncHTTPXTransport}
+
+
+def get_transport(transport: Union[str, BaseTransport], asynchronous: bool = False):
+    base_class = AsyncTransport if asynchronous else Transport
+    if isinstance(transport, BaseTransport):
+        if not isinstance(transport, base_class):
+            raise ValueError(
+                f"Expected an instance of {base_class.__name__}, "
+                f"got {type(transport).__name__}"
+            )
+        return transport
+    transports = ASYNC_TRANSPORTS if asynchronous else TRANSPORTS
+    if transport not in transports:
+        raise ValueError(f"Unknown transport: {transport!r}")
+    return transports[transport]()
@@ -1,3 +1,7 @@
+import hashlib
+import json
+
+
 def handle_error_message(is_success: bool, data_out: dict):
     if "detail" in data_out and not is_success:
         return data_out["detail"]
@@ -13,3 +17,9 @@ def add_index_to_dictionary_list(dict_list: list):
         new_item["index"] = i
         new_dict_list.append(new_item)
     return new_dict_list
+
+
+def hash_payload(data) -> str:
+    if not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
@@ -49,6 +49,20 @@ def validate_routes(routes):
         validate_route(route, route_index)
 
 
+def validate_route_groups(routes, group_size):
+    if not isinstance(routes, list):
+        raise InvalidIntentRouterFormatError("The 'routes' must be a list")
+    if len(routes) == 0:
+        raise InvalidIntentRouterFormatError("At least one route must be provided")
+    max_routes_num = CONFIG_INTENT_ROUTER["max_routes_num"]
+    if not isinstance(group_size, int) or not 2 <= group_size <= max_routes_num:
+        raise InvalidIntentRouterFormatError(
+            f"The 'group_size' must be between 2 and {max_routes_num}"
+        )
+    for route_index, route in enumerate(routes):
+        validate_route(route, route_index)
+
+
 def validate_route(route_dict: dict, route_index: int):
     required_keys = ["name", "description"]
     optional_keys = ["utterances"]
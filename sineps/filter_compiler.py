@@ -0,0 +1,349 @@
+import operator
+from datetime import date, datetime
+from typing import Any, Callable, Union
+
+from ._exceptions import FilterExtractorError
+from .filter_extractor import (
+    ConjunctedFilter,
+    Filter,
+    calculate_date,
+    is_date_expression,
+)
+
+
+FIELD_TYPES = ("string", "number", "list", "date")
+
+COMPARISONS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+OPERATOR_ALIASES = {"==": "=", "<>": "!=", "not_in": "not in"}
+OPERATORS = frozenset(COMPARISONS) | {"in", "not in", "contains", "not contains"}
+COLLECTION_TYPES = (list, tuple, set, frozenset)
+
+
+def normalize_operator(op: str) -> str:
+    normalized = " ".join(str(op).lower().split())
+    normalized = OPERATOR_ALIASES.get(normalized, normalized)
+    if normalized not in OPERATORS:
+        raise FilterExtractorError(f"Unsupported operator: {op!r}")
+    return normalized
+
+
+def normalize_conjunction(conjunction: str) -> str:
+    normalized = str(conjunction).strip().upper()
+    if normalized not in ("AND", "OR"):
+        raise FilterExtractorError(f"Unsupported conjunction: {conjunction!r}")
+    return normalized
+
+
+def get_field_type(field: Union[dict, str]) -> str:
+    field_type = field["type"] if isinstance(field, dict) else field
+    if field_type not in FIELD_TYPES:
+        raise FilterExtractorError(f"The field type must be one of {FIELD_TYPES}.")
+    return field_type
+
+
+def to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def parse_date_operand(value, current_date: date) -> date:
+    if is_date_expression(value):
+        return calculate_date(current_date, value)
+    return to_date(value)
+
+
+def parse_operand(value, op: str, field_type: str, current_date: date):
+    if op in ("in", "not in"):
+        values = value if isinstance(value, COLLECTION_TYPES) else [value]
+        return tuple(
+            parse_operand(item, "=", field_type, current_date) for item in values
+        )
+    if op in ("contains", "not contains") and field_type not in ("string", "list"):
+        raise FilterExtractorError(
+            f"The {op!r} operator is not supported for {field_type} fields"
+        )
+    if field_type == "list" and op not in ("=", "!=", "contains", "not contains"):
+        raise FilterExtractorError(f"The {op!r} operator is not supported for lists")
+    try:
+        if field_type == "number":
+            return float(value)
+        if field_type == "date":
+            return parse_date_operand(value, current_date)
+    except (TypeError, ValueError) as e:
+        raise FilterExtractorError(
+            f"Invalid {field_type} value: {value!r} ({e})"
+        ) from e
+    return str(value)
+
+
+def _compile_tree(node, field_type, current_date, compile_leaf, combine):
+    # compile_leaf(op, operand) builds one leaf evaluator; combine(conjunction,
+    # evaluators) merges the evaluators of a ConjunctedFilter's children.
+    if isinstance(node, Filter):
+        op = normalize_operator(node.operator)
+        return compile_leaf(op, parse_operand(node.value, op, field_type, current_date))
+    if isinstance(node, ConjunctedFilter):
+        conjunction = normalize_conjunction(node.conjunction)
+        return combine(
+            conjunction,
+            tuple(
+                _compile_tree(child, field_type, current_date, compile_leaf, combine)
+                for child in node.filters
+            ),
+        )
+    raise FilterExtractorError("Invalid filter type")
+
+
+def _is_collection(value) -> bool:
+    return not isinstance(value, (str, bytes)) and hasattr(value, "__contains__")
+
+
+def _is_missing(value) -> bool:
+    # None, NaN, NaT and pandas.NA all count as missing.
+    if value is None:
+        return True
+    if _is_collection(value):
+        return False
+    try:
+        return bool(value != value)
+    except (TypeError, ValueError):
+        return True
+
+
+def _list_contains(value, item) -> bool:
+    if _is_collection(value):
+        return item in value
+    return value == item
+
+
+def _predicate_leaf(field_type):
+    def compile_leaf(op, operand):
+        if field_type == "list":
+            if op in ("in", "not in"):
+                matches = lambda value: any(_list_contains(value, x) for x in operand)
+            else:
+                matches = lambda value: _list_contains(value, operand)
+            if op in ("!=", "not in", "not contains"):
+                return lambda value: not matches(value)
+            return matches
+        if op in COMPARISONS:
+            compare = COMPARISONS[op]
+            return lambda value: compare(value, operand)
+        if op == "in":
+            operands = frozenset(operand)
+            return lambda value: value in operands
+        if op == "not in":
+            operands = frozenset(operand)
+            return lambda value: value not in operands
+        if op == "contains":
+            return lambda value: operand in value
+        return lambda value: operand not in value
+
+    return compile_leaf
+
+
+def _predicate_combine(conjunction, predicates):
+    if len(predicates) == 1:
+        return predicates[0]
+    if conjunction == "AND":
+
+        def predicate(value):
+            for child in predicates:
+                if not child(value):
+                    return False
+            return True
+
+    else:
+
+        def predicate(value):
+            for child in predicates:
+                if child(value):
+                    return True
+            return False
+
+    return predicate
+
+
+_ROW_CONVERTERS = {
+    "string": str,
+    "number": float,
+    "list": lambda value: value,
+    "date": to_date,
+}
+
+
+def compile_predicate(
+    result: Union[Filter, ConjunctedFilter, dict],
+    field: Union[dict, str],
+    current_date: date = None,
+) -> Callable[[Any], bool]:
+    field_type = get_field_type(field)
+    if not result:
+        return lambda value: True
+    predicate = _compile_tree(
+        result,
+        field_type,
+        current_date or date.today(),
+        _predicate_leaf(field_type),
+        _predicate_combine,
+    )
+    convert = _ROW_CONVERTERS[field_type]
+
+    def evaluate(value) -> bool:
+        if _is_missing(value):
+            return False
+        try:
+            value = convert(value)
+        except (TypeError, ValueError):
+            return False
+        if field_type == "number" and value != value:
+            # float("nan") parses, but NaN is missing like in the mask.
+            return False
+        return predicate(value)
+
+    return evaluate
+
+
+def _mask_leaf(field_type, np):
+    def compile_leaf(op, operand):
+        if field_type == "date":
+            operand = (
+                tuple(np.datetime64(x, "D") for x in operand)
+                if isinstance(operand, tuple)
+                else np.datetime64(operand, "D")
+            )
+        if field_type == "list" and op in ("=", "!=", "contains", "not contains"):
+            # A column of scalar values: "contains" means "equals".
+            op = "=" if op in ("=", "contains") else "!="
+        if op in COMPARISONS:
+            compare = COMPARISONS[op]
+            return lambda values: compare(values, operand)
+        if op in ("in", "not in"):
+            operands = np.array(operand)
+            invert = op == "not in"
+            return lambda values: np.isin(values, operands, invert=invert)
+        if op == "contains":
+            return lambda values: np.char.find(values, operand) >= 0
+        return lambda values: np.char.find(values, operand) < 0
+
+    return compile_leaf
+
+
+def _mask_combine(np):
+    def combine(conjunction, masks):
+        if len(masks) == 1:
+            return masks[0]
+        reduce = np.logical_and if conjunction == "AND" else np.logical_or
+
+        def mask(values):
+            result = masks[0](values)
+            for child in masks[1:]:
+                result = reduce(result, child(values))
+            return result
+
+        return mask
+
+    return combine
+
+
+def _convert_each(values, convert, missing, dtype, np):
+    # Entries the row predicate would reject become missing instead of raising.
+    def each(value):
+        if _is_missing(value):
+            return missing
+        try:
+            return convert(value)
+        except (TypeError, ValueError):
+            return missing
+
+    return np.array([each(value) for value in values], dtype=dtype)
+
+
+def _prepare_column(values, field_type, np):
+    if hasattr(values, "to_numpy"):
+        if field_type == "date" and getattr(values.dtype, "tz", None) is not None:
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        values = values.to_numpy()
+    values = np.asarray(values)
+    kind = values.dtype.kind
+    if field_type == "number":
+        if kind in "biuf":
+            values = values.astype(float, copy=False)
+        else:
+            values = _convert_each(values, float, np.nan, float, np)
+        return values, ~np.isnan(values)
+    if field_type == "date":
+        if kind == "M":
+            values = values.astype("datetime64[D]", copy=False)
+        else:
+            values = _convert_each(
+                values,
+                lambda value: np.datetime64(to_date(value), "D"),
+                np.datetime64("NaT"),
+                "datetime64[D]",
+                np,
+            )
+        return values, ~np.isnat(values)
+    if kind == "O":
+        valid = np.fromiter(
+            (not _is_missing(value) for value in values), dtype=bool, count=len(values)
+        )
+        values = np.where(valid, values, "").astype(str)
+    elif kind == "f":
+        valid = ~np.isnan(values)
+    elif kind == "M":
+        valid = ~np.isnat(values)
+    else:
+        valid = np.ones(len(values), dtype=bool)
+    if field_type == "string":
+        values = values.astype(str, copy=False)
+    return values, valid
+
+
+def _has_collections(values) -> bool:
+    for value in values:
+        if value is not None:
+            return _is_collection(value)
+    return False
+
+
+def compile_mask(
+    result: Union[Filter, ConjunctedFilter, dict],
+    field: Union[dict, str],
+    current_date: date = None,
+) -> Callable[[Any], Any]:
+    import numpy as np
+
+    field_type = get_field_type(field)
+    if not result:
+        return lambda values: np.ones(len(values), dtype=bool)
+    current_date = current_date or date.today()
+    mask = _compile_tree(
+        result, field_type, current_date, _mask_leaf(field_type, np), _mask_combine(np)
+    )
+    predicate = None
+    if field_type == "list":
+        predicate = compile_predicate(result, field_type, current_date)
+
+    def evaluate(values):
+        if predicate is not None:
+            column = values.to_numpy() if hasattr(values, "to_numpy") else values
+            if _has_collections(column):
+                # Rows holding several values cannot be compared element-wise.
+                return np.fromiter(
+                    map(predicate, column), dtype=bool, count=len(column)
+                )
+        values, valid = _prepare_column(values, field_type, np)
+        return np.logical_and(mask(values), valid)
+
+    return evaluate
@@ -1,49 +1,59 @@
-import json
 from ._exceptions import FilterExtractorError
+from ._codec import dumps_pretty
 from ._rest_adapter import Response
+import calendar
 import re
 from datetime import date, timedelta
-from dateutil.relativedelta import relativedelta
+from functools import lru_cache
+from typing import Iterable, List
 
 
 INDENT = 2
 
+DATE_EXPRESSION_PATTERN = re.compile(r"\$\{\s*current_date\s*([+-])\s*(.*?)\s*\}")
+DATE_CHANGE_PATTERN = re.compile(r"(\d+)([ymd])")
+DATE_CACHE_SIZE = 4096
 
+
+def _add_months(value: date, months: int) -> date:
+    year, month = divmod(value.month - 1 + months, 12)
+    year += value.year
+    day = min(value.day, calendar.monthrange(year, month + 1)[1])
+    return value.replace(year=year, month=month + 1, day=day)
+
+
+def is_date_expression(value) -> bool:
+    return isinstance(value, str) and DATE_EXPRESSION_PATTERN.match(value) is not None
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def calculate_date(current_date: date, expression: str) -> date:
-    match = re.match(r"\$\{\s*current_date\s*([+-])\s*(.*?)\s*\}", expression)
+    match = DATE_EXPRESSION_PATTERN.match(expression)
     if not match:
         raise ValueError("Wrong date expression format.")
-    operation = match.group(1)
-    changes = match.group(2)
-
-    changes_matches = re.findall(r"(\d+)([ymd])", changes)
+    sign = -1 if match.group(1) == "-" else 1
 
+    # Changes are applied one at a time, in order, so month-end clamping
+    # matches applying each relativedelta in sequence.
     result_date = current_date
-
-    for change in changes_matches:
-        value = int(change[0])
-        unit = change[1]
-
-        if unit == "y":
-            delta = relativedelta(years=value)
+    for value, unit in DATE_CHANGE_PATTERN.findall(match.group(2)):
+        value = sign * int(value)
+        if unit == "d":
+            result_date += timedelta(days=value)
         elif unit == "m":
-            delta = relativedelta(months=value)
-        elif unit == "d":
-            delta = timedelta(days=value)
-        else:
-            raise ValueError("Wrong date expression format.")
-
-        if operation == "-":
-            result_date -= delta
+            result_date = _add_months(result_date, value)
         else:
-            result_date += delta
+            result_date = _add_months(result_date, 12 * value)
 
     return result_date
 
 
 class Filter:
+    __slots__ = ("operator", "value")
+
+    type = "Filter"
+
     def __init__(self, operator, value: str):
-        self.type = "Filter"
         self.operator = operator
         self.value = value
 
@@ -55,15 +65,18 @@ class Filter:
         }
 
     def __repr__(self):
-        return json.dumps(self.to_dict(), indent=INDENT, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), INDENT)
 
     def __str__(self):
-        return json.dumps(self.to_dict(), indent=INDENT, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), INDENT)
 
 
 class ConjunctedFilter:
+    __slots__ = ("conjunction", "filters")
+
+    type = "ConjunctedFilter"
+
     def __init__(self, conjunction, filters_dict):
-        self.type = "ConjunctedFilter"
         self.conjunction = conjunction
         self.filters = self._get_filters(filters_dict)
 
@@ -88,18 +101,20 @@ class ConjunctedFilter:
         }
 
     def __repr__(self):
-        return json.dumps(self.to_dict(), indent=INDENT, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), INDENT)
 
     def __str__(self):
-        return json.dumps(self.to_dict(), indent=INDENT, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), INDENT)
 
 
 class FilterExtractorResponse:
+    __slots__ = ("result", "retries")
+
     def __init__(self, response: Response):
-        self.result = self._get_result(response.data)
+        self.result = self._get_result(response.data["result"])
+        self.retries = response.retries
 
-    def _get_result(self, data):
-        result_dict = data["result"]
+    def _get_result(self, result_dict):
         if result_dict == {}:
             return {}
 
@@ -119,10 +134,86 @@ class FilterExtractorResponse:
         return result
 
     def to_dict(self):
-        return {"result": self.result.to_dict()}
+        return {"result": self.result.to_dict() if self.result else {}}
+
+    def resolve_dates(self, current_date: date = None):
+        return resolve_dates(self.result, current_date)
+
+    def to_predicate(self, field, current_date: date = None):
+        from .filter_compiler import compile_predicate
+
+        return compile_predicate(self.result, field, current_date)
+
+    def to_mask(self, field, current_date: date = None):
+        from .filter_compiler import compile_mask
+
+        return compile_mask(self.result, field, current_date)
+
+    def to_sql_where(self, field, column=None, paramstyle="qmark", **kwargs):
+        from .filter_query import to_sql_where
+
+        return to_sql_where(self.result, field, column, paramstyle, **kwargs)
+
+    def to_elasticsearch_query(self, field, field_name=None, current_date=None):
+        from .filter_query import to_elasticsearch_query
+
+        return to_elasticsearch_query(self.result, field, field_name, current_date)
 
     def __repr__(self):
-        return json.dumps(self.to_dict(), indent=INDENT, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), INDENT)
 
     def __str__(self):
-        return json.dumps(self.to_dict(), indent=INDENT, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), INDENT)
+
+
+def _resolve_value(value, current_date: date, resolved: dict):
+    if isinstance(value, list):
+        return [_resolve_value(item, current_date, resolved) for item in value]
+    if not isinstance(value, str):
+        return value
+    result = resolved.get(value)
+    if result is None:
+        if is_date_expression(value):
+            result = calculate_date(current_date, value).isoformat()
+        else:
+            result = value
+        resolved[value] = result
+    return result
+
+
+def _resolve_node(node, current_date: date, resolved: dict):
+    if isinstance(node, Filter):
+        value = _resolve_value(node.value, current_date, resolved)
+        if value == node.value:
+            return node
+        return Filter(node.operator, value)
+    if isinstance(node, ConjunctedFilter):
+        filters = [
+            _resolve_node(child, current_date, resolved) for child in node.filters
+        ]
+        if all(new is old for new, old in zip(filters, node.filters)):
+            return node
+        resolved_node = ConjunctedFilter(node.conjunction, [])
+        resolved_node.filters = filters
+        return resolved_node
+    if node == {}:
+        return node
+    raise FilterExtractorError("Invalid filter type")
+
+
+def resolve_dates(result, current_date: date = None):
+    return _resolve_node(result, current_date or date.today(), {})
+
+
+def resolve_dates_many(responses: Iterable, current_date: date = None) -> List:
+    # One current date and one table of resolved values for the whole batch.
+    current_date = current_date or date.today()
+    resolved = {}
+    return [
+        (
+            _resolve_node(response.result, current_date, resolved)
+            if isinstance(response, FilterExtractorResponse)
+            else response
+        )
+        for response in responses
+    ]
@@ -0,0 +1,169 @@
+from datetime import date
+from typing import Sequence, Tuple, Union
+
+from .filter_compiler import _compile_tree, get_field_type
+from .filter_extractor import ConjunctedFilter, Filter
+
+
+PARAMSTYLES = ("qmark", "numeric", "named", "format", "pyformat")
+
+SQL_OPERATORS = {
+    "=": "=",
+    "!=": "<>",
+    ">": ">",
+    ">=": ">=",
+    "<": "<",
+    "<=": "<=",
+}
+LIKE_ESCAPE = "!"
+
+ELASTICSEARCH_RANGES = {">": "gt", ">=": "gte", "<": "lt", "<=": "lte"}
+
+
+def quote_identifier(name: Union[str, Sequence[str]], quote_char: str = '"') -> str:
+    parts = [name] if isinstance(name, str) else list(name)
+    return ".".join(
+        quote_char + part.replace(quote_char, quote_char * 2) + quote_char
+        for part in parts
+    )
+
+
+class _SQLParams:
+    def __init__(self, paramstyle: str, dates_as_strings: bool):
+        if paramstyle not in PARAMSTYLES:
+            raise ValueError(f"paramstyle must be one of {PARAMSTYLES}")
+        self.paramstyle = paramstyle
+        self.dates_as_strings = dates_as_strings
+        self.values = {} if paramstyle in ("named", "pyformat") else []
+
+    def add(self, value) -> str:
+        if self.dates_as_strings and isinstance(value, date):
+            value = value.isoformat()
+        if isinstance(self.values, dict):
+            name = f"p{len(self.values)}"
+            self.values[name] = value
+            return f":{name}" if self.paramstyle == "named" else f"%({name})s"
+        self.values.append(value)
+        if self.paramstyle == "numeric":
+            return f":{len(self.values)}"
+        return "?" if self.paramstyle == "qmark" else "%s"
+
+
+def _escape_like(value: str) -> str:
+    for char in (LIKE_ESCAPE, "%", "_"):
+        value = value.replace(char, LIKE_ESCAPE + char)
+    return value
+
+
+def _sql_leaf(column, field_type, params):
+    def compile_leaf(op, operand):
+        if field_type == "list" and op in ("contains", "not contains"):
+            # A list field is stored as one value per row: "contains" means "equals".
+            op = "=" if op == "contains" else "!="
+        if op in SQL_OPERATORS:
+            return f"{column} {SQL_OPERATORS[op]} {params.add(operand)}"
+        if op in ("in", "not in"):
+            if not operand:
+                return "1 = 0" if op == "in" else "1 = 1"
+            placeholders = ", ".join(params.add(value) for value in operand)
+            return f"{column} {op.upper()} ({placeholders})"
+        like = "LIKE" if op == "contains" else "NOT LIKE"
+        pattern = params.add(f"%{_escape_like(operand)}%")
+        return f"{column} {like} {pattern} ESCAPE '{LIKE_ESCAPE}'"
+
+    return compile_leaf
+
+
+def _sql_combine(conjunction, clauses):
+    if not clauses:
+        return "1 = 1" if conjunction == "AND" else "1 = 0"
+    if len(clauses) == 1:
+        return clauses[0]
+    return "(" + f" {conjunction} ".join(clauses) + ")"
+
+
+def to_sql_where(
+    result: Union[Filter, ConjunctedFilter, dict],
+    field: Union[dict, str],
+    column: Union[str, Sequence[str]] = None,
+    paramstyle: str = "qmark",
+    current_date: date = None,
+    quote_char: str = '"',
+    dates_as_strings: bool = False,
+) -> Tuple[str, Union[list, dict]]:
+    field_type = get_field_type(field)
+    if column is None:
+        if not isinstance(field, dict):
+            raise ValueError("column is required when field is a type name")
+        column = field["name"]
+    params = _SQLParams(paramstyle, dates_as_strings)
+    if not result:
+        return "1 = 1", params.values
+    clause = _compile_tree(
+        result,
+        field_type,
+        current_date or date.today(),
+        _sql_leaf(quote_identifier(column, quote_char), field_type, params),
+        _sql_combine,
+    )
+    return clause, params.values
+
+
+def _escape_wildcard(value: str) -> str:
+    for char in ("\\", "*", "?"):
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+def _elasticsearch_leaf(name, field_type):
+    def to_json(value):
+        return value.isoformat() if isinstance(value, date) else value
+
+    def must_not(query):
+        # Like SQL, documents without the field never match a negated filter.
+        return {"bool": {"filter": [{"exists": {"field": name}}], "must_not": [query]}}
+
+    def compile_leaf(op, operand):
+        if op in ELASTICSEARCH_RANGES:
+            return {"range": {name: {ELASTICSEARCH_RANGES[op]: to_json(operand)}}}
+        if op in ("in", "not in"):
+            query = {"terms": {name: [to_json(value) for value in operand]}}
+        elif field_type == "string" and op in ("contains", "not contains"):
+            pattern = f"*{_escape_wildcard(operand)}*"
+            query = {"wildcard": {name: {"value": pattern}}}
+        else:
+            # Term queries match any element of a multi-valued (list) field.
+            query = {"term": {name: to_json(operand)}}
+        if op in ("!=", "not in", "not contains"):
+            return must_not(query)
+        return query
+
+    return compile_leaf
+
+
+def _elasticsearch_combine(conjunction, queries):
+    if conjunction == "AND":
+        return {"bool": {"filter": list(queries)}}
+    return {"bool": {"should": list(queries), "minimum_should_match": 1}}
+
+
+def to_elasticsearch_query(
+    result: Union[Filter, ConjunctedFilter, dict],
+    field: Union[dict, str],
+    field_name: str = None,
+    current_date: date = None,
+) -> dict:
+    field_type = get_field_type(field)
+    if field_name is None:
+        if not isinstance(field, dict):
+            raise ValueError("field_name is required when field is a type name")
+        field_name = field["name"]
+    if not result:
+        return {"match_all": {}}
+    return _compile_tree(
+        result,
+        field_type,
+        current_date or date.today(),
+        _elasticsearch_leaf(field_name, field_type),
+        _elasticsearch_combine,
+    )
@@ -1,13 +1,24 @@
-import json
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import List, Tuple, Union
 
 from ._rest_adapter import Response
+from ._validate import validate_routes, validate_route_groups
+from ._cache import make_cache_key
+from ._codec import JSONCodec, default_codec, dumps_pretty
+from ._config import CONFIG
+from ._local_router import LexicalIndex
 
 
 INDENT = 2
+MAX_ROUTES_NUM = CONFIG["intent_router"]["max_routes_num"]
+ROUND_CACHE_SIZE = 1024
+ROUTE_GROUPS_CACHE_SIZE = 64
 
 
 class Route:
+    __slots__ = ("index", "name", "description", "utterances")
+
     def __init__(
         self,
         name: str,
@@ -43,41 +54,328 @@ class Route:
         }
 
     def __repr__(self, indent=INDENT):
-        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), indent)
 
     def __str__(self, indent=INDENT):
-        return json.dumps(self.to_str_dict(), indent=indent, ensure_ascii=False)
+        return dumps_pretty(self.to_str_dict(), indent)
+
+
+class _CompiledRoute(Route):
+    __slots__ = ()
+
+    def __init__(self, name: str, description: str, utterances=(), index=None):
+        object.__setattr__(self, "index", index)
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "description", description)
+        object.__setattr__(self, "utterances", tuple(utterances))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Compiled routes are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Compiled routes are immutable")
+
+    def to_str_dict(self):
+        route = super().to_str_dict()
+        route["utterances"] = list(self.utterances)
+        return route
+
+    def to_dict(self):
+        route = super().to_dict()
+        route["utterances"] = list(self.utterances)
+        return route
+
+
+def _thaw(route: dict) -> dict:
+    return {
+        key: list(value) if key == "utterances" else value
+        for key, value in route.items()
+    }
 
 
 class Routes:
+    __slots__ = ("routes",)
+
     def __init__(self, routes: List[Route]):
         self.routes = routes
 
     def to_dict(self):
         return [route.to_dict() for route in self.routes]
 
+    def compile(self):
+        return CompiledRoutes(self.to_dict())
+
     def __repr__(self, indent=INDENT):
-        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), indent)
 
     def __str__(self, indent=INDENT):
-        return json.dumps(self.to_dict(), indent=indent, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), indent)
+
+
+class _CompiledRouteSet(Routes):
+    __slots__ = ("_route_dicts", "routes_json", "hash", "_encoded_routes")
+
+    def __init__(self, routes: List[dict]):
+        route_dicts = tuple(
+            {
+                key: tuple(value) if key == "utterances" else value
+                for key, value in route.items()
+            }
+            for route in routes
+        )
+        routes = [_thaw(route) for route in route_dicts]
+        routes_json = default_codec().dumps(routes)
+        object.__setattr__(self, "_route_dicts", route_dicts)
+        object.__setattr__(self, "routes_json", routes_json)
+        # Hashed with stdlib json like cache keys, so it does not depend on
+        # which codec is installed.
+        object.__setattr__(self, "hash", make_cache_key(routes))
+        object.__setattr__(self, "_encoded_routes", {default_codec().name: routes_json})
+        object.__setattr__(
+            self,
+            "routes",
+            tuple(
+                _CompiledRoute(**route, index=i) for i, route in enumerate(route_dicts)
+            ),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __len__(self):
+        return len(self.routes)
+
+    def to_dict(self):
+        return [_thaw(route) for route in self._route_dicts]
+
+
+class CompiledRoutes(_CompiledRouteSet):
+    __slots__ = ()
+
+    def __init__(self, routes: List[dict]):
+        validate_routes(routes)
+        super().__init__(routes)
+
+    def compile(self):
+        return self
+
+    def request_body(
+        self, query: str, allow_none: bool, codec: JSONCodec = None
+    ) -> bytes:
+        codec = codec or default_codec()
+        routes_json = self._encoded_routes.get(codec.name)
+        if routes_json is None:
+            routes_json = codec.dumps(self.to_dict())
+            self._encoded_routes[codec.name] = routes_json
+        return b"".join(
+            (
+                b'{"query":',
+                codec.dumps(query),
+                b',"routes":',
+                routes_json,
+                b',"allow_none":true}' if allow_none else b',"allow_none":false}',
+            )
+        )
+
+
+def compile_routes(routes: Union[Routes, List[dict]]) -> CompiledRoutes:
+    if isinstance(routes, Routes):
+        return routes.compile()
+    return CompiledRoutes(routes)
+
+
+def _split(indices, group_size: int) -> List[Tuple[int, ...]]:
+    # Balanced groups: 12 routes become 4 + 4 + 4 rather than 5 + 5 + 2.
+    count = -(-len(indices) // group_size)
+    size, extra = divmod(len(indices), count)
+    groups = []
+    start = 0
+    for i in range(count):
+        end = start + size + (i < extra)
+        groups.append(tuple(indices[start:end]))
+        start = end
+    return groups
+
+
+def tournament_calls(num_routes: int, group_size: int = MAX_ROUTES_NUM) -> int:
+    # API calls needed to narrow num_routes routes down to one.
+    calls = 0
+    while num_routes > 1:
+        num_routes = -(-num_routes // group_size)
+        calls += num_routes
+    return calls
+
+
+class CompiledRouteGroups(_CompiledRouteSet):
+    __slots__ = ("group_size", "groups", "_rounds", "_lock", "_lexical_index")
+
+    def __init__(self, routes: List[dict], group_size: int = MAX_ROUTES_NUM):
+        validate_route_groups(routes, group_size)
+        super().__init__(routes)
+        object.__setattr__(self, "group_size", group_size)
+        object.__setattr__(self, "_rounds", OrderedDict())
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_lexical_index", None)
+        object.__setattr__(
+            self,
+            "groups",
+            tuple(
+                (indices, self._compile(indices))
+                for indices in _split(range(len(self.routes)), group_size)
+            ),
+        )
+
+    def compile(self):
+        # A single API call takes at most max_routes_num routes.
+        return CompiledRoutes(self.to_dict())
+
+    def _compile(self, indices: Tuple[int, ...]) -> CompiledRoutes:
+        with self._lock:
+            routes = self._rounds.get(indices)
+            if routes is not None:
+                self._rounds.move_to_end(indices)
+                return routes
+        routes = CompiledRoutes([_thaw(self._route_dicts[i]) for i in indices])
+        with self._lock:
+            self._rounds[indices] = routes
+            while len(self._rounds) > ROUND_CACHE_SIZE:
+                self._rounds.popitem(last=False)
+        return routes
+
+    def lexical_index(self) -> LexicalIndex:
+        if self._lexical_index is None:
+            object.__setattr__(self, "_lexical_index", LexicalIndex(self))
+        return self._lexical_index
+
+    def max_calls(self) -> int:
+        return len(self.groups) + tournament_calls(len(self.groups), self.group_size)
+
+    def first_round(self, query: str, max_calls: int = None, index=None):
+        groups = self.groups
+        keep = len(groups)
+        if max_calls is not None:
+            while (
+                keep > 1 and keep + tournament_calls(keep, self.group_size) > max_calls
+            ):
+                keep -= 1
+        if keep == len(groups):
+            return groups
+        # Over budget: only play the groups whose routes look closest to the query.
+        scores = (index or self.lexical_index()).scores(query)
+        best = sorted(
+            range(len(groups)),
+            key=lambda g: max(scores[i] for i in groups[g][0]),
+            reverse=True,
+        )[:keep]
+        return tuple(groups[g] for g in sorted(best))
+
+    def next_round(self, candidates: Tuple[int, ...]):
+        return tuple(
+            (indices, self._compile(indices))
+            for indices in _split(candidates, self.group_size)
+        )
+
+
+_route_groups_cache = OrderedDict()
+_route_groups_lock = threading.Lock()
+
+
+def compile_route_groups(
+    routes: Union[Routes, List[dict]], group_size: int = MAX_ROUTES_NUM
+) -> CompiledRouteGroups:
+    if isinstance(routes, CompiledRouteGroups) and routes.group_size == group_size:
+        return routes
+    if isinstance(routes, Routes):
+        routes = routes.to_dict()
+    try:
+        key = (make_cache_key(routes), group_size)
+    except TypeError:
+        return CompiledRouteGroups(routes, group_size)
+    with _route_groups_lock:
+        groups = _route_groups_cache.get(key)
+        if groups is not None:
+            _route_groups_cache.move_to_end(key)
+            return groups
+    groups = CompiledRouteGroups(routes, group_size)
+    with _route_groups_lock:
+        _route_groups_cache[key] = groups
+        while len(_route_groups_cache) > ROUTE_GROUPS_CACHE_SIZE:
+            _route_groups_cache.popitem(last=False)
+    return groups
+
+
+class Tournament:
+    __slots__ = ("groups", "round", "candidates", "calls", "retries", "fallback")
+
+    def __init__(self, groups: CompiledRouteGroups, first_round):
+        self.groups = groups
+        self.round = first_round
+        self.candidates = ()
+        self.calls = 0
+        self.retries = 0
+        self.fallback = False
+
+    def advance(self, results: List[Response]):
+        winners = []
+        for (indices, routes), result in zip(self.round, results):
+            self.calls += 1
+            self.retries += result.retries
+            self.fallback = self.fallback or result.fallback
+            winner = IntentRouterResponse(result, routes).indices
+            if winner:
+                winners.append(indices[winner[0]])
+        self.candidates = tuple(winners)
+        self.round = self.groups.next_round(self.candidates) if len(winners) > 1 else ()
+
+    def response(self) -> Response:
+        routes = [
+            {"index": i, "name": self.groups.routes[i].name} for i in self.candidates
+        ]
+        return Response(
+            200,
+            message="Success",
+            data={"result": {"routes": routes}},
+            retries=self.retries,
+            fallback=self.fallback,
+        )
 
 
 class IntentRouterResponse:
+    __slots__ = ("indices", "retries", "_all_routes", "_result")
+
     def __init__(self, response: Response, all_routes: List[dict]):
-        self.result = self._get_result(response.data, all_routes)
+        self.indices = self._get_result_route_indices(response.data)
+        self.retries = response.retries
+        self._all_routes = all_routes
+        self._result = None
+
+    @property
+    def result(self) -> Routes:
+        if self._result is None:
+            self._result = self._get_result(self.indices, self._all_routes)
+        return self._result
 
     def _get_result_route_indices(self, data):
-        routes = data["result"]["routes"]
-        if len(routes) == 0:
-            return []
-        else:
-            return [route["index"] for route in routes]
+        return tuple(route["index"] for route in data["result"]["routes"])
 
-    def _get_result(self, data, all_routes):
+    def _get_result(self, result_routes_indices, all_routes):
+        if isinstance(all_routes, _CompiledRouteSet):
+            return Routes(routes=[all_routes.routes[i] for i in result_routes_indices])
         if isinstance(all_routes, Routes):
-            all_routes = all_routes.to_dict()
-        result_routes_indices = self._get_result_route_indices(data)
+            return Routes(
+                routes=[
+                    Route(
+                        all_routes.routes[i].name,
+                        all_routes.routes[i].description,
+                        all_routes.routes[i].utterances,
+                        index=i,
+                    )
+                    for i in result_routes_indices
+                ]
+            )
         result = Routes(
             routes=[Route(**all_routes[i], index=i) for i in result_routes_indices]
         )
@@ -88,7 +386,7 @@ class IntentRouterResponse:
         return {"result": self.result.to_dict()}
 
     def __repr__(self):
-        return json.dumps(self.to_dict(), indent=INDENT, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), INDENT)
 
     def __str__(self):
-        return json.dumps(self.to_dict(), indent=INDENT, ensure_ascii=False)
+        return dumps_pretty(self.to_dict(), INDENT)
@@ -0,0 +1,46 @@
+import pytest
+
+from sineps._codec import get_codec
+from sineps._rest_adapter import Response
+from sineps.intent_router import CompiledRoutes, IntentRouterResponse
+
+ROUTES = [
+    {"name": "weather", "description": "Weather questions", "utterances": ["rain?"]},
+    {"name": "news", "description": "News questions"},
+]
+
+
+def test_compiled_routes_are_read_only():
+    routes = CompiledRoutes(ROUTES)
+    body = routes.request_body("query", False, get_codec("json"))
+    with pytest.raises(AttributeError):
+        routes.routes[0].utterances.append("snow?")
+    with pytest.raises(AttributeError):
+        routes.routes[0].name = "other"
+    with pytest.raises(AttributeError):
+        routes.hash = "other"
+    assert routes.to_dict() == ROUTES
+    assert routes.request_body("query", False, get_codec("json")) == body
+
+
+def test_response_routes_are_shared_read_only_routes():
+    routes = CompiledRoutes(ROUTES)
+    response = IntentRouterResponse(
+        Response(200, data={"result": {"routes": [{"index": 0}]}}), routes
+    )
+    assert response.result.routes[0] is routes.routes[0]
+    assert response.to_dict() == {"result": [ROUTES[0]]}
+    with pytest.raises(AttributeError):
+        response.result.routes[0].utterances.append("snow?")
+
+
+def test_hash_does_not_depend_on_the_installed_codec(monkeypatch):
+    import sineps._codec
+
+    hashes = set()
+    for codec in ("json", "auto"):
+        monkeypatch.setattr(sineps._codec, "_default_codec", get_codec(codec))
+        hashes.add(
+            CompiledRoutes([dict(route, name="ünïcode") for route in ROUTES]).hash
+        )
+    assert len(hashes) == 1
@@ -0,0 +1,115 @@
+from datetime import date
+
+import pytest
+
+from sineps._rest_adapter import Response
+from sineps.filter_extractor import (
+    Filter,
+    FilterExtractorResponse,
+    _add_months,
+    calculate_date,
+    resolve_dates,
+    resolve_dates_many,
+)
+
+
+def _response(result):
+    return FilterExtractorResponse(Response(200, data={"result": result}))
+
+
+@pytest.mark.parametrize(
+    "value, months, expected",
+    [
+        (date(2024, 1, 31), 1, date(2024, 2, 29)),
+        (date(2023, 1, 31), 1, date(2023, 2, 28)),
+        (date(2024, 3, 31), -1, date(2024, 2, 29)),
+        (date(2023, 3, 31), -1, date(2023, 2, 28)),
+        (date(2024, 12, 31), 1, date(2025, 1, 31)),
+        (date(2024, 1, 15), -1, date(2023, 12, 15)),
+        (date(2024, 2, 29), 12, date(2025, 2, 28)),
+        (date(2024, 2, 29), -12, date(2023, 2, 28)),
+        (date(2024, 2, 29), 48, date(2028, 2, 29)),
+        (date(2024, 5, 31), -15, date(2023, 2, 28)),
+    ],
+)
+def test_add_months_clamps_to_month_end(value, months, expected):
+    assert _add_months(value, months) == expected
+
+
+@pytest.mark.parametrize(
+    "current_date, expression, expected",
+    [
+        (date(2024, 1, 31), "${current_date + 1m}", date(2024, 2, 29)),
+        (date(2024, 2, 29), "${current_date + 1y}", date(2025, 2, 28)),
+        (date(2024, 2, 29), "${current_date - 1y}", date(2023, 2, 28)),
+        (date(2024, 3, 31), "${current_date - 1m}", date(2024, 2, 29)),
+        (date(2024, 12, 31), "${current_date + 1m}", date(2025, 1, 31)),
+        (date(2024, 12, 31), "${current_date + 1d}", date(2025, 1, 1)),
+        (date(2024, 3, 1), "${ current_date - 1d }", date(2024, 2, 29)),
+    ],
+)
+def test_calculate_date(current_date, expression, expected):
+    assert calculate_date(current_date, expression) == expected
+    assert calculate_date.__wrapped__(current_date, expression) == expected
+
+
+@pytest.mark.parametrize(
+    "current_date, expression, expected",
+    [
+        # Each change is applied in the order it is written.
+        (date(2024, 1, 30), "${current_date + 1m 1d}", date(2024, 3, 1)),
+        (date(2024, 1, 30), "${current_date + 1d 1m}", date(2024, 2, 29)),
+        (date(2023, 1, 31), "${current_date + 1y 1m}", date(2024, 2, 29)),
+        (date(2023, 1, 31), "${current_date + 1m 1y}", date(2024, 2, 28)),
+        (date(2024, 3, 31), "${current_date - 1m 1d}", date(2024, 2, 28)),
+        (date(2024, 3, 31), "${current_date - 1d 1m}", date(2024, 2, 29)),
+    ],
+)
+def test_calculate_date_applies_changes_in_written_order(
+    current_date, expression, expected
+):
+    assert calculate_date(current_date, expression) == expected
+
+
+def test_calculate_date_rejects_invalid_expressions():
+    with pytest.raises(ValueError):
+        calculate_date(date(2024, 1, 1), "2024-01-01")
+
+
+def test_resolve_dates():
+    response = _response(
+        {
+            "type": "ConjunctedFilter",
+            "conjunction": "AND",
+            "filters": [
+                {"type": "Filter", "operator": ">=", "value": "${current_date - 1m}"},
+                {"type": "Filter", "operator": "<=", "value": "2024-12-31"},
+            ],
+        }
+    )
+    resolved = resolve_dates(response.result, date(2024, 3, 31))
+    assert [f.value for f in resolved.filters] == ["2024-02-29", "2024-12-31"]
+    assert resolved.filters[1] is response.result.filters[1]
+    assert response.result.filters[0].value == "${current_date - 1m}"
+    assert response.resolve_dates(date(2024, 3, 31)).to_dict() == resolved.to_dict()
+
+
+def test_resolve_dates_keeps_results_without_expressions():
+    result = _response({"type": "Filter", "operator": "==", "value": "2024-01-31"})
+    assert resolve_dates(result.result, date(2024, 3, 31)) is result.result
+    assert resolve_dates({}, date(2024, 3, 31)) == {}
+
+
+def test_resolve_dates_many():
+    first = _response(
+        {"type": "Filter", "operator": ">=", "value": "${current_date + 1m}"}
+    )
+    second = _response(
+        {"type": "Filter", "operator": "<", "value": "${current_date + 1y}"}
+    )
+    error = ValueError("failed")
+    resolved = resolve_dates_many([first, error, second], date(2024, 1, 31))
+    assert isinstance(resolved[0], Filter)
+    assert resolved[0].value == "2024-02-29"
+    assert resolved[1] is error
+    assert resolved[2].value == "2025-01-31"
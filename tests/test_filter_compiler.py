@@ -0,0 +1,94 @@
+from datetime import date, datetime
+
+import pytest
+
+from sineps.filter_compiler import compile_mask, compile_predicate
+from sineps.filter_extractor import ConjunctedFilter, Filter
+
+np = pytest.importorskip("numpy")
+
+TODAY = date(2024, 1, 10)
+
+COLUMNS = {
+    "number": [
+        np.array([1, 5, 10]),
+        np.array([1.0, np.nan, 7.5]),
+        np.array([True, False]),
+        np.array(["1", "x", "7.5", "nan"], dtype=object),
+        np.array(["3", "x", "9"]),
+        [1, None, "x", 7, float("nan"), True],
+    ],
+    "string": [
+        np.array([1, 5, 10]),
+        np.array([1.5, np.nan, 5.0]),
+        ["abc", None, 5, float("nan"), "5"],
+        np.array(["x5", "y"]),
+    ],
+    "date": [
+        ["2024-01-01", "x", None, date(2024, 3, 1), datetime(2024, 2, 1, 10), 5],
+        np.array(["2024-01-01", "bad"]),
+        np.array([1, 2]),
+        np.array(["2024-01-05", "NaT"], dtype="datetime64[D]"),
+    ],
+    "list": [
+        np.array([1, 5]),
+        ["a", None, "5", float("nan")],
+        np.array([1.0, np.nan]),
+    ],
+}
+
+FILTERS = {
+    "number": [(">=", 5), ("!=", 5), ("in", [1, 7.5]), ("not in", [1])],
+    "string": [
+        ("=", "5"),
+        ("!=", "5"),
+        ("contains", "5"),
+        ("not contains", "5"),
+        ("in", ["5", "abc"]),
+    ],
+    "date": [(">", "2024-01-15"), ("!=", "2024-01-01"), ("not in", ["2024-01-01"])],
+    "list": [("=", "5"), ("!=", "5"), ("contains", "a")],
+}
+
+CASES = [
+    (field_type, column, operator, value)
+    for field_type, columns in COLUMNS.items()
+    for column in columns
+    for operator, value in FILTERS[field_type]
+]
+
+
+@pytest.mark.parametrize("field_type, column, operator, value", CASES)
+def test_mask_agrees_with_predicate(field_type, column, operator, value):
+    other = {"number": 99, "date": "2030-01-01"}.get(field_type, "zz")
+    results = [
+        Filter(operator, value),
+        ConjunctedFilter(
+            "OR",
+            [
+                {"type": "Filter", "operator": operator, "value": value},
+                {"type": "Filter", "operator": "=", "value": other},
+            ],
+        ),
+    ]
+    for result in results:
+        mask = compile_mask(result, field_type, TODAY)(column)
+        predicate = compile_predicate(result, field_type, TODAY)
+        assert mask.tolist() == [predicate(row) for row in column]
+
+
+def test_mask_agrees_with_predicate_on_pandas_columns():
+    pd = pytest.importorskip("pandas")
+    columns = [
+        ("number", pd.Series([1, None, 4], dtype="Int64"), Filter("!=", 4)),
+        ("string", pd.Series(["a5", None, "b"]), Filter("not contains", "5")),
+        (
+            "date",
+            pd.Series(pd.to_datetime(["2024-01-01", None])),
+            Filter("<", "2024-02-01"),
+        ),
+    ]
+    for field_type, column, result in columns:
+        mask = compile_mask(result, field_type, TODAY)(column)
+        predicate = compile_predicate(result, field_type, TODAY)
+        assert mask.tolist() == [predicate(row) for row in column]
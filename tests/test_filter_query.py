@@ -0,0 +1,258 @@
+import re
+import sqlite3
+from datetime import date
+
+import pytest
+
+from sineps.filter_compiler import compile_predicate
+from sineps.filter_extractor import ConjunctedFilter, Filter
+from sineps.filter_query import quote_identifier, to_elasticsearch_query, to_sql_where
+
+TODAY = date(2024, 1, 31)
+
+COLUMNS = {
+    "string": 'ti"tle',
+    "number": "price",
+    "date": "published date",
+    "list": "tag",
+}
+
+ROWS = [
+    (1, "100% sure", 5, "2024-01-01", "a"),
+    (2, "snake_case", 10, "2024-02-15", "b"),
+    (3, "wow!", 1.5, "2023-12-31", "a"),
+    (4, "plain", None, None, None),
+    (5, "x'; DROP TABLE items; --", 7, "2024-03-01", "c"),
+    (6, "snakeXcase", 0, "2024-01-31", "!"),
+]
+
+FILTERS = {
+    "string": [
+        ("=", "wow!"),
+        ("!=", "plain"),
+        ("contains", "%"),
+        ("contains", "_"),
+        ("contains", "!"),
+        ("not contains", "_"),
+        ("in", ["plain", "x'; DROP TABLE items; --"]),
+        ("not in", ["plain"]),
+        ("in", []),
+        ("not in", []),
+    ],
+    "number": [
+        (">", "5"),
+        (">=", 5),
+        ("<", 1.5),
+        ("<=", 1.5),
+        ("!=", 7),
+        ("in", [5, "10"]),
+        ("not in", [0]),
+    ],
+    "date": [
+        (">=", "2024-01-01"),
+        ("<", "${current_date - 1m}"),
+        ("=", "${current_date - 1m}"),
+        ("!=", "2024-01-01"),
+        ("in", ["2024-03-01", "${current_date + 1m}"]),
+        ("not in", ["2024-03-01"]),
+    ],
+    "list": [
+        ("=", "a"),
+        ("!=", "a"),
+        ("contains", "!"),
+        ("not contains", "b"),
+        ("in", ["b", "c"]),
+    ],
+}
+
+CASES = [
+    (field_type, operator, value)
+    for field_type, filters in FILTERS.items()
+    for operator, value in filters
+]
+
+
+def _sqlite_placeholders(where, paramstyle):
+    # sqlite3 only understands qmark, numeric and named placeholders.
+    if paramstyle == "format":
+        return where.replace("%s", "?")
+    if paramstyle == "pyformat":
+        return re.sub(r"%\((\w+)\)s", r":\1", where)
+    return where
+
+
+@pytest.fixture(scope="module")
+def db():
+    conn = sqlite3.connect(":memory:")
+    columns = ", ".join(quote_identifier(name) for name in COLUMNS.values())
+    conn.execute(f"CREATE TABLE items (id INTEGER, {columns})")
+    conn.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?)", ROWS)
+    yield conn
+    conn.close()
+
+
+def _select(db, result, field_type, paramstyle="qmark"):
+    where, params = to_sql_where(
+        result,
+        field_type,
+        column=COLUMNS[field_type],
+        paramstyle=paramstyle,
+        current_date=TODAY,
+        dates_as_strings=True,
+    )
+    sql = f"SELECT id FROM items WHERE {_sqlite_placeholders(where, paramstyle)}"
+    return [row[0] for row in db.execute(f"{sql} ORDER BY id", params)]
+
+
+def _expected(result, field_type):
+    predicate = compile_predicate(result, field_type, TODAY)
+    position = list(COLUMNS).index(field_type) + 1
+    return [row[0] for row in ROWS if predicate(row[position])]
+
+
+@pytest.mark.parametrize(
+    "paramstyle", ["qmark", "numeric", "named", "format", "pyformat"]
+)
+@pytest.mark.parametrize("field_type, operator, value", CASES)
+def test_sql_where_matches_predicate(db, field_type, operator, value, paramstyle):
+    result = Filter(operator, value)
+    assert _select(db, result, field_type, paramstyle) == _expected(result, field_type)
+
+
+@pytest.mark.parametrize(
+    "paramstyle", ["qmark", "numeric", "named", "format", "pyformat"]
+)
+def test_sql_where_conjunctions(db, paramstyle):
+    result = ConjunctedFilter(
+        "OR",
+        [
+            {"type": "Filter", "operator": "contains", "value": "_"},
+            {
+                "type": "ConjunctedFilter",
+                "conjunction": "AND",
+                "filters": [
+                    {"type": "Filter", "operator": "!=", "value": "plain"},
+                    {"type": "Filter", "operator": "not contains", "value": "%"},
+                ],
+            },
+        ],
+    )
+    assert _select(db, result, "string", paramstyle) == [2, 3, 5, 6]
+
+
+def test_sql_where_keeps_values_out_of_the_sql(db):
+    value = "x'; DROP TABLE items; --"
+    where, params = to_sql_where(Filter("=", value), "string", column=COLUMNS["string"])
+    assert where == '"ti""tle" = ?'
+    assert params == [value]
+    assert _select(db, Filter("=", value), "string") == [5]
+    assert db.execute("SELECT COUNT(*) FROM items").fetchone() == (len(ROWS),)
+
+
+def test_sql_where_escapes_like_wildcards():
+    where, params = to_sql_where(
+        Filter("contains", "50%_off!"), "string", column="name", paramstyle="named"
+    )
+    assert where == "\"name\" LIKE :p0 ESCAPE '!'"
+    assert params == {"p0": "%50!%!_off!!%"}
+
+
+def test_sql_where_quotes_qualified_identifiers():
+    where, _ = to_sql_where(
+        Filter(">", 1), "number", column=("my schema", 'ta"ble', "price")
+    )
+    assert where == '"my schema"."ta""ble"."price" > ?'
+    where, _ = to_sql_where(Filter(">", 1), "number", column="price", quote_char="`")
+    assert where == "`price` > ?"
+
+
+def test_sql_where_empty_result_and_errors():
+    assert to_sql_where({}, "string", column="name") == ("1 = 1", [])
+    assert to_sql_where({}, "string", column="name", paramstyle="named") == (
+        "1 = 1",
+        {},
+    )
+    with pytest.raises(ValueError):
+        to_sql_where(Filter("=", "a"), "string", column="name", paramstyle="dollar")
+    with pytest.raises(ValueError):
+        to_sql_where(Filter("=", "a"), "string")
+
+
+def test_sql_where_dates_as_date_objects():
+    where, params = to_sql_where(
+        Filter(">=", "${current_date - 1y}"), "date", column="d", current_date=TODAY
+    )
+    assert where == '"d" >= ?'
+    assert params == [date(2023, 1, 31)]
+
+
+def test_elasticsearch_query_for_each_field_type():
+    field = {"name": "title", "description": "", "type": "string"}
+    assert to_elasticsearch_query(Filter("contains", "50%*?\\"), field) == {
+        "wildcard": {"title": {"value": "*50%\\*\\?\\\\*"}}
+    }
+    assert to_elasticsearch_query(Filter("!=", "plain"), field) == {
+        "bool": {
+            "filter": [{"exists": {"field": "title"}}],
+            "must_not": [{"term": {"title": "plain"}}],
+        }
+    }
+    assert to_elasticsearch_query(Filter(">=", "5"), "number", "price") == {
+        "range": {"price": {"gte": 5.0}}
+    }
+    assert to_elasticsearch_query(Filter("in", [5, "10"]), "number", "price") == {
+        "terms": {"price": [5.0, 10.0]}
+    }
+    assert to_elasticsearch_query(
+        Filter("<", "${current_date - 1m}"), "date", "published", TODAY
+    ) == {"range": {"published": {"lt": "2023-12-31"}}}
+    assert to_elasticsearch_query(Filter("contains", "a"), "list", "tags") == {
+        "term": {"tags": "a"}
+    }
+    assert to_elasticsearch_query(Filter("not in", ["a", "b"]), "list", "tags") == {
+        "bool": {
+            "filter": [{"exists": {"field": "tags"}}],
+            "must_not": [{"terms": {"tags": ["a", "b"]}}],
+        }
+    }
+
+
+def test_elasticsearch_query_conjunctions():
+    result = ConjunctedFilter(
+        "OR",
+        [
+            {"type": "Filter", "operator": "<", "value": 1},
+            {
+                "type": "ConjunctedFilter",
+                "conjunction": "AND",
+                "filters": [
+                    {"type": "Filter", "operator": ">=", "value": 5},
+                    {"type": "Filter", "operator": "!=", "value": 7},
+                ],
+            },
+        ],
+    )
+    assert to_elasticsearch_query(result, "number", "price") == {
+        "bool": {
+            "should": [
+                {"range": {"price": {"lt": 1.0}}},
+                {
+                    "bool": {
+                        "filter": [
+                            {"range": {"price": {"gte": 5.0}}},
+                            {
+                                "bool": {
+                                    "filter": [{"exists": {"field": "price"}}],
+                                    "must_not": [{"term": {"price": 7.0}}],
+                                }
+                            },
+                        ]
+                    }
+                },
+            ],
+            "minimum_should_match": 1,
+        }
+    }
+    assert to_elasticsearch_query({}, "number", "price") == {"match_all": {}}
+    with pytest.raises(ValueError):
+        to_elasticsearch_query(Filter("=", 1), "number")
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from sineps._exceptions import APITimeoutError
+from sineps._single_flight import AsyncSingleFlight, SingleFlight
+from sineps._timeout import deadline_at
+
+
+def _fetch(seconds, expires_at, started=None):
+    def fetch():
+        if started is not None:
+            started.set()
+        if expires_at is not None and seconds > expires_at - time.monotonic():
+            time.sleep(max(0.0, expires_at - time.monotonic()))
+            raise APITimeoutError("Request timed out")
+        time.sleep(seconds)
+        return "ok"
+
+    return fetch
+
+
+def test_follower_keeps_its_own_deadline():
+    flight = SingleFlight()
+    started = threading.Event()
+    results = {}
+
+    def leader():
+        expires_at = deadline_at(0.2)
+        try:
+            flight.do("key", _fetch(0.5, expires_at, started), expires_at)
+        except APITimeoutError as e:
+            results["leader"] = e
+
+    def follower(name, deadline):
+        started.wait()
+        expires_at = deadline_at(deadline)
+        begin = time.monotonic()
+        try:
+            results[name] = flight.do("key", _fetch(0.5, expires_at), expires_at)
+        except APITimeoutError as e:
+            results[name] = e
+        results[f"{name}_elapsed"] = time.monotonic() - begin
+
+    threads = [
+        threading.Thread(target=leader),
+        threading.Thread(target=follower, args=("short", 0.05)),
+        threading.Thread(target=follower, args=("long", 5)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert isinstance(results["leader"], APITimeoutError)
+    assert isinstance(results["short"], APITimeoutError)
+    assert results["short_elapsed"] < 0.15
+    assert results["long"] == "ok"
+    assert flight.stats()["executions"] == 2
+
+
+def test_async_follower_keeps_its_own_deadline():
+    async def fetch(seconds, expires_at):
+        if seconds > expires_at - time.monotonic():
+            await asyncio.sleep(max(0.0, expires_at - time.monotonic()))
+            raise APITimeoutError("Request timed out")
+        await asyncio.sleep(seconds)
+        return "ok"
+
+    async def call(flight, deadline, delay=0.0):
+        await asyncio.sleep(delay)
+        expires_at = deadline_at(deadline)
+        return await flight.do(
+            "key", lambda: fetch(0.5, expires_at), expires_at=expires_at
+        )
+
+    async def main():
+        flight = AsyncSingleFlight()
+        results = await asyncio.gather(
+            call(flight, 0.2),
+            call(flight, 0.05, 0.01),
+            call(flight, 5, 0.01),
+            return_exceptions=True,
+        )
+        return flight, results
+
+    flight, (leader, short, long) = asyncio.run(main())
+    assert isinstance(leader, APITimeoutError)
+    assert isinstance(short, APITimeoutError)
+    assert long == "ok"
+    assert flight.stats()["executions"] == 2
+
+
+def test_errors_are_shared_without_deadlines():
+    flight = SingleFlight()
+
+    def fail():
+        raise APITimeoutError("Request timed out")
+
+    with pytest.raises(APITimeoutError):
+        flight.do("key", fail)